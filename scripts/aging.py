@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Análise de envelhecimento (aging) e coortes dos processos do Gestão Segura.
+
+Monta uma vez por sincronização dois índices ordenados, por dias_aberto e por
+data_cadastro, e responde a partir deles, em O(n log n) no total:
+- quantis de dias_aberto e contagem por faixa de idade;
+- percentis de dias_aberto por fornecedor;
+- matriz de coortes: dos processos cadastrados em cada mês, quantos seguiam
+  abertos (sem data_entrega) depois de N dias.
+
+O resultado é um bloco compacto publicado em analysis["envelhecimento"].
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+from sync_processos import parse_date
+
+QUANTIS = (25, 50, 75, 90, 95)
+
+# Faixas de idade em dias: (rótulo, limite superior inclusivo); a última é aberta
+FAIXAS = (
+    ("0-15", 15),
+    ("16-30", 30),
+    ("31-45", 45),
+    ("46-90", 90),
+    ("91-180", 180),
+    ("181-365", 365),
+    ("366+", None),
+)
+
+# Marcos (em dias) das colunas da matriz de coortes
+MARCOS_COORTE = (30, 60, 90, 180)
+
+
+def _percentile(sorted_values, pct):
+    """Percentil pelo método do posto mais próximo."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, -(-pct * len(sorted_values) // 100) - 1)]
+
+
+def _parse_int(value):
+    try:
+        return int(float(value))
+    except (ValueError, TypeError):
+        return None
+
+
+class AgingIndex:
+    """Índices ordenados por dias_aberto e por data_cadastro."""
+
+    def __init__(self, processos, today=None):
+        self.processos = processos
+        self.today = today or date.today()
+
+        by_dias = []
+        by_cadastro = []
+        for i, p in enumerate(processos):
+            dias = _parse_int(p.get("dias_aberto", ""))
+            if dias is not None:
+                by_dias.append((dias, i))
+            cadastro = parse_date(p.get("data_cadastro", ""))
+            if cadastro:
+                by_cadastro.append((cadastro.toordinal(), i))
+
+        by_dias.sort()
+        by_cadastro.sort()
+        self.dias = [d for d, _ in by_dias]
+        self.dias_ids = [i for _, i in by_dias]
+        self.cadastro = [c for c, _ in by_cadastro]
+        self.cadastro_ids = [i for _, i in by_cadastro]
+
+    def quantis(self):
+        return {f"p{pct}": _percentile(self.dias, pct) for pct in QUANTIS}
+
+    def faixas(self):
+        contagem = {}
+        inicio = 0
+        for rotulo, limite in FAIXAS:
+            fim = bisect_right(self.dias, limite) if limite is not None else len(self.dias)
+            contagem[rotulo] = fim - inicio
+            inicio = fim
+        return contagem
+
+    def por_fornecedor(self):
+        # Percorrer o índice ordenado já deixa a lista de cada fornecedor ordenada
+        grupos = {}
+        for dias, i in zip(self.dias, self.dias_ids):
+            forn = self.processos[i].get("nome_fornecedor", "").strip()
+            if forn:
+                grupos.setdefault(forn, []).append(dias)
+        return {
+            forn: {
+                "quantidade": len(valores),
+                "p50": _percentile(valores, 50),
+                "p90": _percentile(valores, 90),
+                "max": valores[-1],
+            }
+            for forn, valores in sorted(grupos.items())
+        }
+
+    def coortes(self):
+        """
+        {mês: [total, [elegíveis, abertos] por marco]}.
+
+        Elegíveis ao marco N são os processos cadastrados há pelo menos N dias;
+        abertos são os que seguiam abertos no dia N, ou seja, com duração
+        (cadastro até a entrega, ou até hoje) de pelo menos N dias. Uma entrega
+        com data futura ainda não aconteceu: conta como aberto até hoje.
+        """
+        hoje = self.today.toordinal()
+        resultado = {}
+        inicio = 0
+        while inicio < len(self.cadastro):
+            # Faixa contígua do índice ordenado com o mesmo mês de cadastro
+            primeiro = date.fromordinal(self.cadastro[inicio])
+            proximo_mes = date(primeiro.year + primeiro.month // 12, primeiro.month % 12 + 1, 1)
+            fim = bisect_left(self.cadastro, proximo_mes.toordinal(), inicio)
+
+            idades = []
+            duracoes = []
+            for pos in range(inicio, fim):
+                cadastro = self.cadastro[pos]
+                entrega = parse_date(self.processos[self.cadastro_ids[pos]].get("data_entrega", ""))
+                idades.append(hoje - cadastro)
+                duracoes.append((min(entrega.toordinal(), hoje) if entrega else hoje) - cadastro)
+            idades.sort()
+            duracoes.sort()
+
+            celulas = []
+            for marco in MARCOS_COORTE:
+                elegiveis = len(idades) - bisect_left(idades, marco)
+                # duração <= idade, então todo aberto no marco também é elegível
+                abertos = len(duracoes) - bisect_left(duracoes, marco)
+                celulas.append([elegiveis, abertos])
+
+            resultado[f"{primeiro.year}-{str(primeiro.month).zfill(2)}"] = [fim - inicio, celulas]
+            inicio = fim
+        return resultado
+
+    def summary(self):
+        return {
+            "quantis": self.quantis(),
+            "faixas": self.faixas(),
+            "por_fornecedor": self.por_fornecedor(),
+            "marcos_coorte": list(MARCOS_COORTE),
+            "coortes": self.coortes(),
+        }
+
+
+def aging_analysis(processos, today=None):
+    """Bloco analysis["envelhecimento"]."""
+    return AgingIndex(processos, today).summary()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Medições de desempenho da sincronização do Gestão Segura.
+
+- inicialização: tempo desde o início do interpretador até a primeira
+  requisição estar pronta para sair (imports + montagem da Request), medido
+  em subprocessos novos;
+- pipeline: tempo de cada etapa (parse do CSV, processamento, análise e
+  gravação) sobre uma planilha sintética montada a partir do JSON de dados
+  ou, sem ele (checkout novo), do snapshot publicado em patches/.
+
+Uso:
+    python scripts/gestaosegura.py bench --repeticoes 10 --limite-ms 150
+    python scripts/gestaosegura.py bench --escala 100 --historico bench.jsonl
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Caminho percorrido por "gestaosegura sync" até a primeira requisição
+STARTUP_PROBE = (
+    "import sys; sys.path.insert(0, {scripts!r}); "
+    "import gestaosegura, sync_processos, urllib.request; "
+    "urllib.request.Request(sync_processos.CSV_URL)"
+)
+
+
+def measure_startup(repeticoes):
+    """Tempo (ms) de cada execução do probe de inicialização em um processo novo."""
+    code = STARTUP_PROBE.format(scripts=SCRIPTS_DIR)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def load_processos(data_file):
+    """Processos do JSON de dados ou, se ele não existir, do snapshot base + patches."""
+    from jsonlib import load_file
+    from snapshot_diff import load_snapshot
+    from sync_processos import PATCH_DIR
+
+    if os.path.exists(data_file):
+        return load_file(data_file)["processos"], data_file
+    snapshot = load_snapshot(PATCH_DIR)
+    if snapshot is None:
+        return None, None
+    return snapshot["processos"], f"{PATCH_DIR} (base + patches)"
+
+
+def synthetic_csv(processos, escala):
+    """CSV no formato da planilha, com os processos publicados repetidos `escala` vezes."""
+    from sync_processos import HEADERS
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["Acompanhamento de processos"])
+    for _ in range(escala):
+        for p in processos:
+            writer.writerow([p.get(h, "") for h in HEADERS])
+    return buf.getvalue()
+
+
+def measure_pipeline(text):
+    """Tempo (ms) de cada etapa da sincronização, gravando em um diretório temporário."""
+    import sync_processos
+
+    etapas = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        os.chdir(tmp)
+        try:
+            inicio = time.perf_counter()
+            rows = sync_processos.parse_csv_text(text)
+            etapas["parse_csv"] = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            processos = sync_processos.process_rows(rows)
+            etapas["process_rows"] = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            analysis = sync_processos.generate_analysis(processos)
+            etapas["generate_analysis"] = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            sync_processos.save_data(processos, analysis)
+            etapas["save_data"] = time.perf_counter() - inicio
+        finally:
+            os.chdir(cwd)
+    return {etapa: round(t * 1000, 1) for etapa, t in etapas.items()}, len(processos)
+
+
+def main(argv=None):
+    from sync_processos import OUTPUT_FILE
+
+    parser = argparse.ArgumentParser(description="Mede inicialização e etapas da sincronização.")
+    parser.add_argument("--repeticoes", type=int, default=5, help="execuções do probe de inicialização")
+    parser.add_argument("--limite-ms", type=float, help="falha se a mediana da inicialização passar deste valor")
+    parser.add_argument("--arquivo", default=OUTPUT_FILE, help="JSON usado para montar a planilha sintética")
+    parser.add_argument("--escala", type=int, default=1, help="multiplica os processos da planilha sintética")
+    parser.add_argument("--historico", help="arquivo JSONL onde cada medição é acrescentada")
+    args = parser.parse_args(argv)
+
+    tempos = measure_startup(args.repeticoes)
+    mediana = statistics.median(tempos)
+    print(f"Inicialização até a primeira requisição: mediana {mediana:.1f} ms (mín. {min(tempos):.1f} ms)")
+
+    resultado = {"data": datetime.now().isoformat(), "inicializacao_ms": round(mediana, 1)}
+    processos, origem = load_processos(args.arquivo)
+    if processos is not None:
+        etapas, total = measure_pipeline(synthetic_csv(processos, args.escala))
+        print(f"Pipeline com {total:,} processos (de {origem}):")
+        for etapa, ms in etapas.items():
+            print(f"  {etapa:<18} {ms:>10.1f} ms")
+        resultado.update(processos=total, etapas_ms=etapas)
+    else:
+        print(f"{args.arquivo} não encontrado e nenhum snapshot publicado: medição do pipeline ignorada")
+
+    if args.historico:
+        with open(args.historico, "a", encoding="utf-8") as f:
+            f.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+    if args.limite_ms is not None and mediana > args.limite_ms:
+        print(f"ERRO: inicialização acima do limite de {args.limite_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
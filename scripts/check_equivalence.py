@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+Verificação de equivalência entre o pipeline otimizado e as implementações de referência.
+
+Gera planilhas aleatórias (com células malformadas: datas impossíveis, erros
+de fórmula, valores monetários inválidos, linhas curtas, protocolos repetidos,
+acentos) e roda lado a lado:
+
+- process_rows / generate_analysis / save_data de referência (a versão
+  original, simples, copiada abaixo) e as versões atuais de sync_processos;
+- os motores otimizados e uma verificação independente de cada um: somas em
+  centavos x centavos conhecidos na geração da planilha, dias úteis por array
+  acumulado x contagem dia a dia, índices ordenados de aging x laços diretos
+  (quantis, faixas, fornecedores e coortes), consultas da API por bitmaps x
+  filtro linear, patch JSON aplicado x snapshot novo, serializador em
+  streaming (stdlib ou orjson, o que estiver instalado) x json.dumps.
+
+A saída precisa ser semanticamente idêntica: os registros e a análise atuais
+restritos aos campos da referência, e os bytes gravados iguais. O tempo de
+cada caso é medido e resumido no final.
+
+Uso:
+    python scripts/gestaosegura.py check --casos 200 --semente 1
+    python scripts/gestaosegura.py check --semente 1 --hoje 19/10/2026   # reproduz uma falha
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import math
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import sync_processos
+from sync_processos import HEADERS
+
+# ---------------------------------------------------------------------------
+# Implementações de referência (comportamento original de sync_processos.py)
+# ---------------------------------------------------------------------------
+
+
+def ref_parse_date(date_str):
+    if not date_str or date_str.strip() == "":
+        return None
+    try:
+        parts = date_str.strip().split("/")
+        if len(parts) == 3:
+            dia, mes, ano = int(parts[0]), int(parts[1]), int(parts[2])
+            if ano < 100:
+                ano += 2000
+            return date(ano, mes, dia)
+    except (ValueError, IndexError):
+        pass
+    return None
+
+
+def ref_calculate_dias_aberto(data_cadastro_str, today):
+    dt = ref_parse_date(data_cadastro_str)
+    if dt:
+        return (today - dt).days
+    return None
+
+
+def ref_calculate_criticidade(dias_reparos_str, dias_aberto):
+    try:
+        dias_reparos = int(float(dias_reparos_str)) if dias_reparos_str and dias_reparos_str.strip() else None
+    except (ValueError, TypeError):
+        dias_reparos = None
+
+    if dias_reparos is not None:
+        if dias_reparos > 30:
+            return "Crítico"
+        elif dias_reparos > 15:
+            return "Atenção"
+        return "Dentro do Prazo"
+
+    if dias_aberto is not None:
+        if dias_aberto > 90:
+            return "Crítico"
+        elif dias_aberto > 45:
+            return "Atenção"
+        return "Dentro do Prazo"
+    return None
+
+
+def ref_process_rows(rows, today):
+    if not rows:
+        return []
+    data_rows = rows[1:] if len(rows) > 1 else rows
+
+    processos = []
+    for row in data_rows:
+        if not row or not row[0].strip():
+            continue
+        first_cell = row[0].strip()
+        if first_cell.lower() in ("protocolo", "") or not any(c.isdigit() for c in first_cell):
+            continue
+
+        processo = {}
+        for i, header in enumerate(HEADERS):
+            processo[header] = row[i].strip() if i < len(row) and row[i] else ""
+
+        if not processo["dias_aberto"] or processo["dias_aberto"] in ("", "#VALUE!", "#REF!", "#N/A"):
+            calculated = ref_calculate_dias_aberto(processo["data_cadastro"], today)
+            processo["dias_aberto"] = str(calculated) if calculated is not None else ""
+
+        if not processo["criticidade"] or processo["criticidade"] in ("", "#VALUE!", "#REF!", "#N/A"):
+            dias_aberto_val = None
+            try:
+                dias_aberto_val = int(float(processo["dias_aberto"])) if processo["dias_aberto"] else None
+            except (ValueError, TypeError):
+                pass
+            crit = ref_calculate_criticidade(processo["dias_reparos"], dias_aberto_val)
+            processo["criticidade"] = crit if crit else ""
+
+        processos.append(processo)
+    return processos
+
+
+def ref_generate_analysis(processos):
+    analysis = {
+        "total_processos": len(processos),
+        "criticidade": {"Crítico": 0, "Atenção": 0, "Dentro do Prazo": 0, "Sem Classificação": 0},
+        "situacao_sga": defaultdict(int),
+        "tipo": defaultdict(int),
+        "fornecedores": defaultdict(int),
+        "processos_por_mes": defaultdict(int),
+        "top_mais_antigos": [],
+        "top_fornecedores": [],
+    }
+    processos_com_dias = []
+
+    for p in processos:
+        crit = p.get("criticidade", "")
+        if crit in analysis["criticidade"]:
+            analysis["criticidade"][crit] += 1
+        else:
+            analysis["criticidade"]["Sem Classificação"] += 1
+
+        sit = p.get("situacao_sga", "").strip()
+        if sit:
+            analysis["situacao_sga"][sit] += 1
+        tipo = p.get("tipo", "").strip()
+        if tipo:
+            analysis["tipo"][tipo] += 1
+        forn = p.get("nome_fornecedor", "").strip()
+        if forn:
+            analysis["fornecedores"][forn] += 1
+
+        dt = ref_parse_date(p.get("data_cadastro", ""))
+        if dt:
+            analysis["processos_por_mes"][f"{dt.year}-{str(dt.month).zfill(2)}"] += 1
+
+        try:
+            dias = int(float(p.get("dias_aberto", "")))
+            processos_com_dias.append({
+                "protocolo": p.get("protocolo", ""),
+                "associado": p.get("associado", ""),
+                "dias_aberto": dias,
+                "criticidade": p.get("criticidade", ""),
+            })
+        except (ValueError, TypeError):
+            pass
+
+    processos_com_dias.sort(key=lambda x: x["dias_aberto"], reverse=True)
+    analysis["top_mais_antigos"] = processos_com_dias[:10]
+
+    forn_sorted = sorted(analysis["fornecedores"].items(), key=lambda x: x[1], reverse=True)
+    analysis["top_fornecedores"] = [{"nome": k, "quantidade": v} for k, v in forn_sorted[:10]]
+
+    analysis["situacao_sga"] = dict(analysis["situacao_sga"])
+    analysis["tipo"] = dict(analysis["tipo"])
+    analysis["fornecedores"] = dict(analysis["fornecedores"])
+    analysis["processos_por_mes"] = dict(sorted(analysis["processos_por_mes"].items()))
+    return analysis
+
+
+def ref_save_data(output, pretty=True):
+    """Bytes que o save_data original gravaria para `output`."""
+    if pretty:
+        return json.dumps(output, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(output, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def ref_business_days(start, end, feriados):
+    """Dias úteis após start até end, contando dia a dia (negativo se end < start)."""
+    if end < start:
+        return -ref_business_days(end, start, feriados)
+    total = 0
+    day = start
+    while day != end:
+        day += timedelta(days=1)
+        if day.weekday() < 5 and day not in feriados:
+            total += 1
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Geração de planilhas aleatórias
+# ---------------------------------------------------------------------------
+
+NOMES = ["José", "Maria", "JOÃO", "Ana Paula", "Conceição", "Müller", "D'Ávila", "Silva", "Souza", "Lima"]
+FORNECEDORES = ["MOVIMENTO MAIS BRASIL", "PPS PRESTADOR DE SERVIÇO LTDA", "WGCAR PERFORMANCE LTDA", ""]
+SITUACOES = ["REPARO AUTORIZADO- GS", "VISTORIA", "PROC. SMT", "AVISO DE EVENTO", ""]
+TIPOS = ["ASSOCIADO", "TERCEIRO", ""]
+CRITICIDADES = ["Crítico", "Atenção", "Dentro do Prazo", "", "#N/A", "#VALUE!", "#REF!", "#DIV/0!", "Outro"]
+LIXO = ["#VALUE!", "#REF!", "#N/A", "#DIV/0!", "abc", "??", " ", "31/02/2026", "00/13/2025", "1/1", "2026-05-01",
+        "01/01/9999", "15/03/1899"]
+
+# Valores monetários escritos à mão, com os centavos esperados (None = inválido)
+CENTAVOS_CONHECIDOS = {
+    "R$ 1.234,5": 123450,
+    "-R$ 10,00": -1000,
+    "R$ 0,07": 7,
+    "1.234": 123400,
+    "R$ 12.345.678,90": 1234567890,
+    "R$ 1,2,3": None,
+    "1,234": None,
+    "1234.56": None,
+    "12.5": None,
+    "1.23.456": None,
+    "R$": None,
+    **{lixo: None for lixo in LIXO},
+}
+
+
+def _random_date(rng, today):
+    dt = today - timedelta(days=rng.randint(-30, 2500))
+    choice = rng.random()
+    if choice < 0.75:
+        return dt.strftime("%d/%m/%Y")
+    if choice < 0.85:
+        return f"{dt.day}/{dt.month}/{dt.year % 100}"
+    if choice < 0.93:
+        return ""
+    return rng.choice(LIXO)
+
+
+def _random_money(rng, centavos):
+    """Texto monetário gerado a partir de centavos conhecidos, anotados em `centavos`."""
+    choice = rng.random()
+    cents = rng.randint(0, 30_000_000)
+    reais, cent = divmod(cents, 100)
+    formatted = f"{reais:,}".replace(",", ".") + f",{cent:02d}"
+    if choice < 0.45:
+        text = f"R$ {formatted}"
+    elif choice < 0.55:
+        text = formatted
+    elif choice < 0.6:
+        text, cents = f"R$ {reais}", reais * 100
+    elif choice < 0.85:
+        text, cents = "", None
+    else:
+        text = rng.choice(list(CENTAVOS_CONHECIDOS))
+        cents = CENTAVOS_CONHECIDOS[text]
+    centavos[text] = cents
+    return text
+
+
+def _random_name(rng):
+    return " ".join(rng.choice(NOMES) for _ in range(rng.randint(1, 3)))
+
+
+def _random_plate(rng):
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return "".join(rng.choice(letters) for _ in range(3)) + str(rng.randint(0, 9)) + \
+        rng.choice(letters + "0123456789") + f"{rng.randint(0, 99):02d}"
+
+
+def random_sheet(rng, n, today, centavos=None):
+    """
+    Linhas CSV no formato da planilha "Dados", incluindo linhas malformadas.
+
+    `centavos` recebe, para cada texto monetário gerado, o valor esperado.
+    """
+    centavos = {} if centavos is None else centavos
+    rows = [["Acompanhamento de processos - descrição"]]
+    protocolos = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.02:
+            rows.append([])
+            continue
+        if kind < 0.04:
+            rows.append(["", "sobra"] + [""] * rng.randint(0, 5))
+            continue
+        if kind < 0.06:
+            rows.append([rng.choice(["TOTAL", "Protocolo", "protocolo", "Resumo"])] + [""] * 5)
+            continue
+
+        if protocolos and rng.random() < 0.1:
+            protocolo = rng.choice(protocolos)
+        else:
+            protocolo = str(2026200000000 + rng.randint(0, 999999))
+            protocolos.append(protocolo)
+
+        row = {
+            "protocolo": f" {protocolo} " if rng.random() < 0.05 else protocolo,
+            "data_cadastro": _random_date(rng, today),
+            "motivo": rng.choice(["COLISÃO", "ROUBO", ""]),
+            "tipo": rng.choice(TIPOS),
+            "situacao_sga": rng.choice(SITUACOES),
+            "associado": _random_name(rng),
+            "placa": _random_plate(rng),
+            "nome_terceiro": _random_name(rng) if rng.random() < 0.3 else "",
+            "placa_terceiro": _random_plate(rng) if rng.random() < 0.3 else "",
+            "situacao_evento": rng.choice(["Aberto", ""]),
+            "abertura_processo": _random_date(rng, today),
+            "data_limite_autorizacao": _random_date(rng, today),
+            "data_autorizacao_reparos": _random_date(rng, today),
+            "data_entrega": _random_date(rng, today) if rng.random() < 0.3 else "",
+            "dias_reparos": rng.choice(["", "", str(rng.randint(0, 60)), "12.5", "#VALUE!", "x"]),
+            "data_descricao": _random_date(rng, today),
+            "valor_reparo": _random_money(rng, centavos),
+            "valor_fipe": _random_money(rng, centavos),
+            "custo_evento": _random_money(rng, centavos),
+            "previsao_valor_reparo": _random_money(rng, centavos),
+            "nome_fornecedor": rng.choice(FORNECEDORES),
+            "dias_aberto": rng.choice(["", str(rng.randint(0, 2000)), "#VALUE!", "#REF!", "#N/A", "#DIV/0!", "7.0", "abc"]),
+            "criticidade": rng.choice(CRITICIDADES),
+            "parecer_coordenacao": rng.choice(["", "ok", "aguardando \"peças\"\n2ª via"]),
+        }
+        cells = [row[h] for h in HEADERS]
+        if rng.random() < 0.05:
+            cells = cells[:rng.randint(1, len(cells) - 1)]
+        elif rng.random() < 0.05:
+            cells += ["extra"] * rng.randint(1, 3)
+        rows.append(cells)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Comparações
+# ---------------------------------------------------------------------------
+
+
+class Mismatch(AssertionError):
+    pass
+
+
+def expect(condition, what):
+    if not condition:
+        raise Mismatch(what)
+
+
+def _project(records, keys):
+    return [{k: r[k] for k in keys} for r in records]
+
+
+def check_pipeline(rows, today):
+    from quarantine import RejectedRows
+
+    ref = ref_process_rows(rows, today)
+    opt = sync_processos.process_rows(rows, RejectedRows(), today)
+    expect(_project(opt, HEADERS) == ref, "process_rows diverge da referência")
+
+    ref_analysis = ref_generate_analysis(ref)
+    opt_analysis = sync_processos.generate_analysis(opt, today)
+    expect({k: opt_analysis[k] for k in ref_analysis} == ref_analysis,
+           "generate_analysis diverge da referência")
+    return opt, opt_analysis
+
+
+def check_valores(processos, analysis, centavos):
+    from valores import MONEY_FIELDS
+
+    def esperado_de(value):
+        return centavos[value] if value else None
+
+    for field, total_name in MONEY_FIELDS.items():
+        esperado = sum(c for c in (esperado_de(p[field]) for p in processos) if c is not None)
+        expect(analysis["valores"]["centavos"][total_name] == esperado,
+               f"soma de {field} diverge dos centavos gerados")
+
+        por_fornecedor = defaultdict(int)
+        for p in processos:
+            cents = esperado_de(p[field])
+            if cents is not None and p["nome_fornecedor"].strip():
+                por_fornecedor[p["nome_fornecedor"].strip()] += cents
+        calculado = {k: v[field]["soma"] for k, v in analysis["valores"]["por_fornecedor"].items() if field in v}
+        expect(calculado == dict(por_fornecedor), f"soma de {field} por fornecedor diverge")
+
+
+def check_sla(processos, today):
+    from dias_uteis import feriados_nacionais
+
+    feriados = set()
+    for p in processos:
+        start = ref_parse_date(p["data_cadastro"])
+        end = ref_parse_date(p["data_entrega"]) or today
+        if start is None or not (2000 <= start.year <= 2100 and 2000 <= end.year <= 2100) or end < start:
+            expect(p["dias_uteis_entrega"] == "" and p["sla_entrega"] == "",
+                   f"SLA preenchido com datas ausentes, implausíveis ou invertidas: {start} -> {end}")
+            continue
+        for year in range(min(start, end).year, max(start, end).year + 1):
+            feriados |= feriados_nacionais(year)
+        expect(int(p["dias_uteis_entrega"]) == ref_business_days(start, end, feriados),
+               f"dias úteis divergem para {start} -> {end}")
+
+
+def _nearest_rank(sorted_values, pct):
+    if not sorted_values:
+        return None
+    return sorted_values[max(1, math.ceil(pct * len(sorted_values) / 100)) - 1]
+
+
+def check_aging(processos, analysis, today):
+    from aging import FAIXAS, MARCOS_COORTE, QUANTIS
+
+    dias = sorted(int(float(p["dias_aberto"])) for p in processos
+                  if _is_number(p["dias_aberto"]))
+    bloco = analysis["envelhecimento"]
+    for pct in QUANTIS:
+        expect(bloco["quantis"][f"p{pct}"] == _nearest_rank(dias, pct), f"quantil p{pct} diverge")
+
+    limite_anterior = float("-inf")
+    for rotulo, limite in FAIXAS:
+        teto = float("inf") if limite is None else limite
+        esperado = sum(1 for d in dias if limite_anterior < d <= teto)
+        expect(bloco["faixas"][rotulo] == esperado, f"faixa {rotulo} diverge")
+        limite_anterior = teto
+
+    grupos = defaultdict(list)
+    for p in processos:
+        if _is_number(p["dias_aberto"]) and p["nome_fornecedor"].strip():
+            grupos[p["nome_fornecedor"].strip()].append(int(float(p["dias_aberto"])))
+    esperado = {}
+    for forn, valores in grupos.items():
+        valores.sort()
+        esperado[forn] = {"quantidade": len(valores), "p50": _nearest_rank(valores, 50),
+                          "p90": _nearest_rank(valores, 90), "max": max(valores)}
+    expect(bloco["por_fornecedor"] == esperado, "percentis por fornecedor divergem")
+
+    # Coortes: para cada processo e cada marco, decide direto pelas datas
+    expect(bloco["marcos_coorte"] == list(MARCOS_COORTE), "marcos da matriz de coortes divergem")
+    coortes = {}
+    for p in processos:
+        cadastro = ref_parse_date(p["data_cadastro"])
+        if cadastro is None:
+            continue
+        entrega = ref_parse_date(p["data_entrega"])
+        fechamento = today if entrega is None or entrega > today else entrega
+        linha = coortes.setdefault(f"{cadastro.year:04d}-{cadastro.month:02d}",
+                                   [0, [[0, 0] for _ in MARCOS_COORTE]])
+        linha[0] += 1
+        for celula, marco in zip(linha[1], MARCOS_COORTE):
+            if today - cadastro >= timedelta(days=marco):
+                celula[0] += 1
+            if fechamento - cadastro >= timedelta(days=marco):
+                celula[1] += 1
+    expect(bloco["coortes"] == coortes, "matriz de coortes diverge")
+
+
+def _is_number(value):
+    try:
+        int(float(value))
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def check_serializer(output):
+    import serializer
+
+    encoders = [serializer._encode_stdlib]
+    if serializer.orjson is not None:
+        encoders.append(serializer.encode)
+    for pretty in (True, False):
+        esperado = ref_save_data(output, pretty)
+        for encoder in encoders:
+            buf = io.BytesIO()
+            serializer.write_stream(buf, output, pretty=pretty, encoder=encoder)
+            expect(buf.getvalue() == esperado,
+                   f"serializador ({encoder.__name__}, pretty={pretty}) diverge de json.dumps")
+
+
+def check_patch(previous, output):
+    from snapshot_diff import apply_patch, diff_snapshots
+
+    ops, _ = diff_snapshots(previous, output)
+    # Round trip por JSON: o patch é publicado e aplicado a partir de arquivos
+    doc = json.loads(json.dumps(previous, ensure_ascii=False))
+    apply_patch(doc, json.loads(json.dumps(ops, ensure_ascii=False)))
+    expect(doc == json.loads(json.dumps(output, ensure_ascii=False)), "patch aplicado diverge do snapshot novo")
+
+
+def check_read_api(rng, output):
+    from read_api import CATEGORY_FIELDS, ProcessoIndex, _sort_key
+
+    index = ProcessoIndex(output, "check")
+    processos = output["processos"]
+    for _ in range(5):
+        params = {}
+        for field in CATEGORY_FIELDS:
+            if rng.random() < 0.4:
+                values = sorted({p[field] for p in processos}) or [""]
+                params[field] = ",".join(rng.sample(values, min(len(values), rng.randint(1, 2))))
+        if rng.random() < 0.4:
+            params["dias_min"] = str(rng.randint(0, 500))
+        ordenar = rng.choice(["", "dias_aberto", "data_cadastro", "data_entrega"])
+        if ordenar:
+            params["ordenar"] = ordenar
+            params["ordem"] = rng.choice(["asc", "desc"])
+        params["pagina"] = str(rng.randint(1, 3))
+        params["por_pagina"] = str(rng.randint(1, 40))
+
+        selecionados = []
+        for i, p in enumerate(processos):
+            if any(p[f].strip() not in params[f].split(",") for f in CATEGORY_FIELDS if f in params):
+                continue
+            if "dias_min" in params:
+                dias = _sort_key("dias_aberto", p["dias_aberto"])
+                if dias is None or dias < int(params["dias_min"]):
+                    continue
+            selecionados.append(i)
+
+        if ordenar:
+            com_valor = [i for i in selecionados if _sort_key(ordenar, processos[i][ordenar]) is not None]
+            sem_valor = [i for i in selecionados if _sort_key(ordenar, processos[i][ordenar]) is None]
+            com_valor.sort(key=lambda i: (_sort_key(ordenar, processos[i][ordenar]), i),
+                           reverse=params["ordem"] == "desc")
+            selecionados = com_valor + sem_valor
+
+        pagina, por_pagina = int(params["pagina"]), int(params["por_pagina"])
+        esperado = [processos[i] for i in selecionados[(pagina - 1) * por_pagina:pagina * por_pagina]]
+        resposta = index.query(params)
+        expect(resposta["total"] == len(selecionados) and resposta["processos"] == esperado,
+               f"consulta da API diverge do filtro linear: {params}")
+
+
+# ---------------------------------------------------------------------------
+# Execução
+# ---------------------------------------------------------------------------
+
+
+def run_case(rng, n, today):
+    """
+    Executa um caso; retorna (tempo_referência_ms, tempo_otimizado_ms).
+
+    Os dois lados usam a mesma data de referência `today`.
+    """
+    centavos = {}
+    rows = random_sheet(rng, n, today, centavos)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        ref = ref_process_rows(rows, today)
+        ref_output = {"analysis": ref_generate_analysis(ref), "processos": ref}
+        ref_save_data(ref_output)
+        tempo_ref = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        processos = sync_processos.process_rows(rows, today=today)
+        analysis = sync_processos.generate_analysis(processos, today)
+        output = sync_processos.build_output(processos, analysis)
+        import serializer
+        serializer.write_stream(io.BytesIO(), output)
+        tempo_opt = time.perf_counter() - inicio
+
+        check_pipeline(rows, today)
+        check_valores(processos, analysis, centavos)
+        check_sla(processos, today)
+        check_aging(processos, analysis, today)
+        check_serializer(output)
+        check_read_api(rng, output)
+
+        # Segundo snapshot: a mesma planilha com edições, inclusões e remoções
+        rows2 = copy.deepcopy(rows)
+        for _ in range(rng.randint(0, 5)):
+            if len(rows2) > 2 and rng.random() < 0.4:
+                del rows2[rng.randint(1, len(rows2) - 1)]
+            else:
+                rows2.extend(random_sheet(rng, 1, today)[1:])
+        for row in rows2[1:]:
+            if row and rng.random() < 0.1 and len(row) > 4:
+                row[4] = rng.choice(SITUACOES)
+        processos2 = sync_processos.process_rows(rows2, today=today)
+        output2 = sync_processos.build_output(processos2, sync_processos.generate_analysis(processos2, today))
+        check_patch(json.loads(json.dumps(output, ensure_ascii=False)), output2)
+
+    return tempo_ref * 1000, tempo_opt * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara o pipeline otimizado com as implementações de referência.")
+    parser.add_argument("--casos", type=int, default=100)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--linhas", type=int, default=200, help="linhas máximas por planilha gerada")
+    parser.add_argument("--historico", help="arquivo JSONL com o tempo de cada caso")
+    parser.add_argument("--hoje", help="data de referência DD/MM/AAAA (padrão: hoje), para reproduzir uma falha")
+    args = parser.parse_args(argv)
+
+    # Uma única data para a execução inteira: as planilhas geradas e os dois
+    # lados da comparação dependem dela
+    today = ref_parse_date(args.hoje) if args.hoje else date.today()
+    if today is None:
+        parser.error(f"data inválida: {args.hoje}")
+
+    tempos = []
+    historico = open(args.historico, "a", encoding="utf-8") if args.historico else None
+    try:
+        for caso in range(args.casos):
+            rng = random.Random(args.semente * 1_000_003 + caso)
+            n = rng.randint(0, args.linhas)
+            try:
+                tempo_ref, tempo_opt = run_case(rng, n, today)
+            except Mismatch as e:
+                print(f"FALHA no caso {caso} (semente {args.semente}, hoje {today:%d/%m/%Y}, {n} linhas): {e}")
+                return 1
+            tempos.append((tempo_ref, tempo_opt))
+            if historico:
+                historico.write(json.dumps({"caso": caso, "semente": args.semente, "linhas": n,
+                                            "referencia_ms": round(tempo_ref, 3),
+                                            "otimizado_ms": round(tempo_opt, 3)}) + "\n")
+    finally:
+        if historico:
+            historico.close()
+
+    if tempos:
+        ref_med = statistics.median(t for t, _ in tempos)
+        opt_med = statistics.median(t for _, t in tempos)
+        import serializer
+        motor = "orjson" if serializer.orjson else "stdlib"
+        print(f"{len(tempos)} casos equivalentes (semente {args.semente}, serializador {motor})")
+        print(f"Mediana por caso: referência {ref_med:.2f} ms, pipeline atual {opt_med:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
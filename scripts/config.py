@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Configuração dos scripts do Gestão Segura.
+
+Os valores padrão ficam aqui; qualquer chave pode ser sobrescrita no arquivo
+gestaosegura.json na raiz do repositório (ou no caminho indicado pela variável
+de ambiente GESTAOSEGURA_CONFIG). O arquivo é lido uma única vez por processo.
+
+Exemplo de gestaosegura.json:
+    {"intervalo_watch": 120, "sla_entrega_dias_uteis": 25}
+"""
+import os
+from functools import lru_cache
+
+CONFIG_ENV = "GESTAOSEGURA_CONFIG"
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gestaosegura.json")
+
+DEFAULTS = {
+    # sync_processos.py
+    "spreadsheet_id": "15AS3FlLpmRQwjRCv11dIR9pgE14c2u3XyrFPPMcaFJo",
+    "sheet_name": "Dados",
+    "output_file": "public/data/processos.json",
+    "patch_dir": "public/data/patches",
+    "formato_saida": "pretty",
+    "arquivo_rejeitados": "logs/rejeitados.jsonl",
+    "sla_entrega_dias_uteis": 30,
+    "intervalo_watch": 300,
+    "porta_watch": 8765,
+    # read_api.py
+    "porta_api": 8780,
+}
+
+
+@lru_cache(maxsize=None)
+def load_config(path=None):
+    """Retorna a configuração efetiva (padrões + arquivo, se existir)."""
+    path = path or os.environ.get(CONFIG_ENV) or CONFIG_FILE
+    config = dict(DEFAULTS)
+    if os.path.exists(path):
+        import json
+
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"chaves desconhecidas em {path}: {', '.join(sorted(unknown))}")
+        config.update(overrides)
+    return config
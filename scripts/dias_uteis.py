@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Calendário de dias úteis e cálculo de SLA dos processos do Gestão Segura.
+
+Pré-calcula os feriados nacionais brasileiros (fixos e móveis, a partir da
+Páscoa) e um array de contagem acumulada de dias úteis, de modo que a
+diferença em dias úteis entre duas datas é O(1): acumulado[fim] - acumulado[início].
+
+As etapas de SLA são aplicadas em lote a todos os processos, gravando em cada
+registro os dias úteis da etapa e a situação ("Dentro do Prazo" / "Estourado"),
+e gerando um resumo por etapa para o dashboard.
+"""
+from array import array
+from datetime import date, timedelta
+
+from sync_processos import parse_date
+
+# Faixa padrão do calendário; é estendida automaticamente se aparecerem datas fora dela
+DEFAULT_FIRST_YEAR = 2015
+DEFAULT_LAST_YEAR = 2035
+
+# Faixa plausível de datas: fora dela é erro de digitação ("01/01/9999") e a
+# data não entra no calendário nem no SLA
+MIN_YEAR = 2000
+MAX_YEAR = 2100
+
+SLA_DENTRO = "Dentro do Prazo"
+SLA_ESTOURADO = "Estourado"
+
+
+def easter(year):
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def feriados_nacionais(year):
+    """Feriados nacionais (e Carnaval / Corpus Christi, sem expediente bancário)."""
+    pascoa = easter(year)
+    feriados = {
+        date(year, 1, 1),    # Confraternização Universal
+        date(year, 4, 21),   # Tiradentes
+        date(year, 5, 1),    # Dia do Trabalho
+        date(year, 9, 7),    # Independência
+        date(year, 10, 12),  # Nossa Senhora Aparecida
+        date(year, 11, 2),   # Finados
+        date(year, 11, 15),  # Proclamação da República
+        date(year, 12, 25),  # Natal
+        pascoa - timedelta(days=48),  # Carnaval (segunda)
+        pascoa - timedelta(days=47),  # Carnaval (terça)
+        pascoa - timedelta(days=2),   # Sexta-feira Santa
+        pascoa + timedelta(days=60),  # Corpus Christi
+    }
+    if year >= 2024:
+        feriados.add(date(year, 11, 20))  # Dia Nacional de Zumbi e da Consciência Negra
+    return feriados
+
+
+class BusinessCalendar:
+    """Contagem acumulada de dias úteis entre first_year e last_year (inclusive)."""
+
+    def __init__(self, first_year=DEFAULT_FIRST_YEAR, last_year=DEFAULT_LAST_YEAR):
+        self.first_year = first_year
+        self.last_year = last_year
+        self.origin = date(first_year, 1, 1).toordinal()
+        end = date(last_year, 12, 31).toordinal()
+
+        feriados = set()
+        for year in range(first_year, last_year + 1):
+            feriados.update(feriados_nacionais(year))
+        feriados = {d.toordinal() for d in feriados}
+
+        # cumulative[i] = dias úteis em [origin, origin + i)
+        cumulative = array("l", [0])
+        total = 0
+        for ordinal in range(self.origin, end + 1):
+            # toordinal(): 1 = segunda-feira de 01/01/0001, logo % 7 em {6, 0} é fim de semana
+            if ordinal % 7 not in (6, 0) and ordinal not in feriados:
+                total += 1
+            cumulative.append(total)
+        self.cumulative = cumulative
+
+    def is_business_day(self, dt):
+        i = dt.toordinal() - self.origin
+        return self.cumulative[i + 1] - self.cumulative[i] == 1
+
+    def diff(self, start, end):
+        """Dias úteis após start até end (inclusive); negativo se end < start."""
+        return self.cumulative[end.toordinal() - self.origin + 1] - self.cumulative[start.toordinal() - self.origin + 1]
+
+
+_calendar = None
+
+
+def plausible(dt):
+    return MIN_YEAR <= dt.year <= MAX_YEAR
+
+
+def get_calendar(dates=()):
+    """Calendário compartilhado, estendido (até MIN_YEAR/MAX_YEAR) se alguma data cair fora da faixa."""
+    global _calendar
+    years = [d.year for d in dates if plausible(d)]
+    first = min(years + [DEFAULT_FIRST_YEAR])
+    last = max(years + [DEFAULT_LAST_YEAR])
+    if _calendar is None or first < _calendar.first_year or last > _calendar.last_year:
+        _calendar = BusinessCalendar(first, last)
+    return _calendar
+
+
+class SlaStage:
+    """
+    Etapa de SLA entre duas colunas de data.
+
+    dias_field e status_field são as colunas gravadas em cada processo.
+    Sem data final, a etapa está em andamento e é medida até hoje. Datas fora
+    da faixa plausível ou com o fim antes do início deixam as colunas vazias.
+    """
+
+    def __init__(self, nome, start_field, end_field, limite, dias_field, status_field):
+        self.nome = nome
+        self.start_field = start_field
+        self.end_field = end_field
+        self.limite = limite
+        self.dias_field = dias_field
+        self.status_field = status_field
+
+
+def apply_sla(processos, stages, today=None, rejected=None):
+    """
+    Grava em cada processo os dias úteis e a situação de cada etapa.
+
+    Datas implausíveis ou invertidas vão para `rejected` (quarantine.RejectedRows)
+    como data_invalida.
+    """
+    today = today or date.today()
+
+    # Datas parseadas uma vez por coluna
+    parsed = {}
+    for stage in stages:
+        for field in (stage.start_field, stage.end_field):
+            if field not in parsed:
+                parsed[field] = [parse_date(p.get(field, "")) for p in processos]
+
+    all_dates = [d for column in parsed.values() for d in column if d] + [today]
+    calendar = get_calendar(all_dates)
+
+    def reject(p, field, erro):
+        if rejected is not None:
+            rejected.reject("data_invalida", campo=field, valor=p.get(field, ""), erro=erro,
+                            protocolo=p.get("protocolo", ""))
+
+    for stage in stages:
+        for p, start, end in zip(processos, parsed[stage.start_field], parsed[stage.end_field]):
+            p[stage.dias_field] = ""
+            p[stage.status_field] = ""
+            if start is None:
+                continue
+            if not plausible(start):
+                reject(p, stage.start_field, "fora_da_faixa")
+                continue
+            if end is not None and not plausible(end):
+                reject(p, stage.end_field, "fora_da_faixa")
+                continue
+            if (end or today) < start:
+                reject(p, stage.end_field if end else stage.start_field, "fim_antes_do_inicio")
+                continue
+            dias = calendar.diff(start, end or today)
+            p[stage.dias_field] = str(dias)
+            p[stage.status_field] = SLA_ESTOURADO if dias > stage.limite else SLA_DENTRO
+
+
+def summarize_sla(processos, stages):
+    """Resumo por etapa (concluídos, em andamento, estourados, média) para a análise."""
+    resumo = {}
+    for stage in stages:
+        concluidos = em_andamento = estourados = soma = 0
+        for p in processos:
+            dias = p.get(stage.dias_field, "")
+            if not dias:
+                continue
+            if parse_date(p.get(stage.end_field, "")):
+                concluidos += 1
+                soma += int(dias)
+            else:
+                em_andamento += 1
+            if p.get(stage.status_field) == SLA_ESTOURADO:
+                estourados += 1
+
+        resumo[stage.nome] = {
+            "limite_dias_uteis": stage.limite,
+            "concluidos": concluidos,
+            "em_andamento": em_andamento,
+            "estourados": estourados,
+            "media_dias_uteis_concluidos": round(soma / concluidos, 1) if concluidos else None,
+        }
+    return resumo
@@ -1,35 +1,39 @@
 #!/usr/bin/env python3
 """
-Script para gerar tabela HTML dos 51 processos únicos
-Lê o arquivo JSON sincronizado e gera um arquivo HTML com a tabela
+Script para gerar tabela HTML dos processos únicos (Protocolo GS + Nome)
+
+Pode rodar sozinho, lendo o arquivo JSON sincronizado, ou como etapa de saída
+de sync_sheets_data.py, que reaproveita o índice de processos únicos e a
+contagem de status já calculados em memória.
 """
 
 import json
 from collections import OrderedDict
 from datetime import datetime
 
-def generate_processos_html():
+from quarantine import RejectedRows
+
+INPUT_FILE = 'data/processos.json'
+OUTPUT_FILE = 'processos-lista.html'
+REJECTED_FILE = 'logs/rejeitados-tabela.jsonl'
+
+def dedup_processos(processos, rejected=None):
     """
-    Gera arquivo HTML com a tabela de processos
+    Índice de processos únicos por Protocolo GS + Nome, mantendo o registro
+    com a Data Sincronismo mais recente
     """
-    print("=" * 60)
-    print("📊 GERANDO TABELA DE PROCESSOS")
-    print("=" * 60)
-    
-    # Load the JSON file
-    with open('data/processos.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    processos = data['processos']
-    
     # Create a dictionary to track unique processes by Protocol + Name
     processos_unicos = OrderedDict()
+    if rejected is None:
+        rejected = RejectedRows()
     
-    for processo in processos:
+    for indice, processo in enumerate(processos):
         protocolo = processo.get('Protocolo GS', '').strip()
         nome = processo.get('Nome', '').strip()
         
-        if protocolo and nome:
+        if not (protocolo and nome):
+            rejected.reject('sem_protocolo_ou_nome', indice, processo)
+        else:
             chave = (protocolo, nome)
             
             if chave not in processos_unicos:
@@ -47,15 +51,26 @@ def generate_processos_html():
                             processos_unicos[chave] = processo
                     elif data_nova:
                         processos_unicos[chave] = processo
-                except:
-                    pass
+                except ValueError:
+                    rejected.reject('data_sincronismo_invalida', indice, processo,
+                                    atual=data_atual, nova=data_nova)
     
-    # Count status distribution
+    return processos_unicos
+
+def count_status(processos_unicos):
+    """
+    Distribuição de status dos processos únicos
+    """
     status_count = {}
     for processo in processos_unicos.values():
         status = processo.get('Status', 'Desconhecido')
         status_count[status] = status_count.get(status, 0) + 1
-    
+    return status_count
+
+def render_html(processos_unicos, status_count, metadata):
+    """
+    Monta o HTML da tabela de processos
+    """
     # Sort by status count (descending)
     status_sorted = sorted(status_count.items(), key=lambda x: x[1], reverse=True)
     
@@ -329,7 +344,7 @@ def generate_processos_html():
             </div>
             <div class="metadata-item">
                 <span class="metadata-label">Última Sincronização</span>
-                <span class="metadata-value">''' + data['metadata']['ultima_atualizacao'].split('T')[0] + '''</span>
+                <span class="metadata-value">''' + metadata['ultima_atualizacao'].split('T')[0] + '''</span>
             </div>
             <div class="metadata-item">
                 <span class="metadata-label">Status Únicos</span>
@@ -354,7 +369,7 @@ def generate_processos_html():
                     <p>Status Diferentes</p>
                 </div>
                 <div class="stat-card">
-                    <h3>''' + str(data['metadata']['total_registros']) + '''</h3>
+                    <h3>''' + str(metadata['total_registros']) + '''</h3>
                     <p>Registros Totais</p>
                 </div>
             </div>
@@ -432,14 +447,42 @@ def generate_processos_html():
 </html>
 '''
     
-    # Write to file
-    with open('processos-lista.html', 'w', encoding='utf-8') as f:
+    return html
+
+def write_html(html, path=OUTPUT_FILE):
+    """
+    Grava o HTML gerado
+    """
+    with open(path, 'w', encoding='utf-8') as f:
         f.write(html)
+
+def generate_processos_html():
+    """
+    Gera arquivo HTML com a tabela de processos a partir do JSON sincronizado
+    """
+    print("=" * 60)
+    print("📊 GERANDO TABELA DE PROCESSOS")
+    print("=" * 60)
+    
+    # Load the JSON file
+    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    with RejectedRows(REJECTED_FILE) as rejected:
+        processos_unicos = dedup_processos(data['processos'], rejected)
+    status_count = count_status(processos_unicos)
+    
+    write_html(render_html(processos_unicos, status_count, data['metadata']))
     
     print(f"✅ Arquivo gerado com sucesso!")
     print(f"   - Total de processos: {len(processos_unicos)}")
     print(f"   - Status únicos: {len(status_count)}")
-    print(f"   - Arquivo: processos-lista.html")
+    print(f"   - Arquivo: {OUTPUT_FILE}")
+    rejected.print_report()
 
-if __name__ == "__main__":
+def main(argv=None):
     generate_processos_html()
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
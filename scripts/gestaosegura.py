@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Ponto de entrada único dos scripts do Gestão Segura.
+
+Uso:
+    python scripts/gestaosegura.py sync [--watch] [--intervalo N] [--porta N]
+    python scripts/gestaosegura.py table
+    python scripts/gestaosegura.py bench [--repeticoes N] [--limite-ms N]
+
+Cada subcomando só importa o próprio módulo quando é chamado, para manter a
+inicialização rápida no modo de polling frequente.
+"""
+import importlib
+import sys
+
+# subcomando -> (módulo, função que recebe a lista de argumentos restantes, descrição)
+COMMANDS = {
+    "sync": ("sync_processos", "main", "sincroniza a planilha e publica os dados"),
+    "table": ("generate_processos_table", "main", "gera processos-lista.html"),
+    "bench": ("bench", "main", "mede inicialização e tempo de cada etapa"),
+    "check": ("check_equivalence", "main", "compara o pipeline com as implementações de referência"),
+}
+
+
+def usage():
+    lines = ["Uso: gestaosegura <comando> [opções]", "", "Comandos:"]
+    lines += [f"  {name:<6} {desc}" for name, (_, _, desc) in COMMANDS.items()]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help") or argv[0] not in COMMANDS:
+        print(usage())
+        return 0 if argv and argv[0] in ("-h", "--help") else 2
+
+    module_name, func_name, _ = COMMANDS[argv[0]]
+    module = importlib.import_module(module_name)
+    return getattr(module, func_name)(argv[1:])
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Backend JSON com aceleração opcional.
+
+Usa orjson ou ujson quando instalados (detectados em tempo de execução) e cai
+para o json da biblioteca padrão caso contrário. Nenhum deles é dependência
+obrigatória.
+"""
+try:
+    import orjson as _backend
+    BACKEND = "orjson"
+except ImportError:
+    try:
+        import ujson as _backend
+        BACKEND = "ujson"
+    except ImportError:
+        import json as _backend
+        BACKEND = "json"
+
+
+def loads(data):
+    """Decodifica JSON a partir de str ou bytes."""
+    if BACKEND == "json" and isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return _backend.loads(data)
+
+
+def load_file(path):
+    """Lê e decodifica um arquivo JSON."""
+    with open(path, "rb") as f:
+        return loads(f.read())
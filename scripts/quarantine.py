@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Canal de linhas rejeitadas (quarentena) da sincronização do Gestão Segura.
+
+Linhas descartadas ou campos que não puderam ser interpretados são gravados,
+com um código de motivo, em um arquivo JSONL separado, para diagnóstico sem
+precisar rodar a sincronização de novo. O canal não guarda as linhas em
+memória (só contadores por motivo) e o arquivo é limitado:
+
+- as primeiras AMOSTRAR_APOS ocorrências são gravadas integralmente;
+- depois disso, só uma a cada FATOR_AMOSTRAGEM é gravada;
+- nunca mais que MAX_REGISTROS linhas por execução.
+
+Os contadores são sempre exatos, mesmo quando a gravação é amostrada.
+
+Avisos (warn) registram problemas em linhas que foram mantidas, como colunas
+faltando; são contados à parte e gravados com "nivel": "aviso".
+"""
+import json
+import os
+from collections import Counter
+
+MAX_REGISTROS = 1000
+AMOSTRAR_APOS = 200
+FATOR_AMOSTRAGEM = 10
+
+# Colunas de cada linha copiadas para o arquivo (evita registros gigantes)
+MAX_COLUNAS = 30
+
+
+class RejectedRows:
+    """Recebe rejeições e grava uma amostra limitada em `path` (None: só conta)."""
+
+    def __init__(self, path=None, max_registros=MAX_REGISTROS,
+                 amostrar_apos=AMOSTRAR_APOS, fator=FATOR_AMOSTRAGEM):
+        self.path = path
+        self.max_registros = max_registros
+        self.amostrar_apos = amostrar_apos
+        self.fator = fator
+        self.contagem = Counter()
+        self.avisos = Counter()
+        self.total = 0
+        self.eventos = 0
+        self.gravados = 0
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _should_write(self):
+        if self.path is None or self.gravados >= self.max_registros:
+            return False
+        if self.eventos <= self.amostrar_apos:
+            return True
+        return (self.eventos - self.amostrar_apos) % self.fator == 0
+
+    def reject(self, motivo, linha=None, dados=None, **detalhes):
+        """Registra uma rejeição com código de motivo, número da linha e dados brutos."""
+        self.total += 1
+        self.contagem[motivo] += 1
+        self._record(None, motivo, linha, dados, detalhes)
+
+    def warn(self, motivo, linha=None, dados=None, **detalhes):
+        """Registra um problema em uma linha que foi mantida."""
+        self.avisos[motivo] += 1
+        self._record("aviso", motivo, linha, dados, detalhes)
+
+    def _record(self, nivel, motivo, linha, dados, detalhes):
+        self.eventos += 1
+        if not self._should_write():
+            return
+
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Um arquivo por execução: o anterior é sobrescrito
+            self._file = open(self.path, "w", encoding="utf-8")
+
+        registro = {"motivo": motivo, "linha": linha}
+        if nivel:
+            registro["nivel"] = nivel
+        registro.update(detalhes)
+        if dados is not None:
+            registro["dados"] = list(dados[:MAX_COLUNAS]) if isinstance(dados, (list, tuple)) else dados
+        self._file.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self.gravados += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        elif self.path and not self.gravados and os.path.exists(self.path):
+            # Execução sem rejeições: não deixa o arquivo da execução anterior
+            os.remove(self.path)
+
+    def report(self):
+        """Resumo para o relatório da execução."""
+        return {
+            "total": self.total,
+            "por_motivo": dict(self.contagem.most_common()),
+            "avisos": dict(self.avisos.most_common()),
+            "gravados": self.gravados,
+            "amostrado": self.eventos > self.gravados,
+            "arquivo": self.path if self.gravados else None,
+        }
+
+    def print_report(self):
+        if not self.eventos:
+            return
+        if self.total:
+            print(f"Linhas/campos rejeitados: {self.total}")
+            for motivo, n in self.contagem.most_common():
+                print(f"  {motivo}: {n}")
+        if self.avisos:
+            print(f"Avisos (linhas mantidas): {sum(self.avisos.values())}")
+            for motivo, n in self.avisos.most_common():
+                print(f"  {motivo}: {n}")
+        if self.gravados:
+            amostra = " (amostra)" if self.eventos > self.gravados else ""
+            print(f"Detalhes{amostra} em {self.path}")
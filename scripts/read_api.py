@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+API local de leitura dos processos do Gestão Segura.
+
+Serviço HTTP opcional que carrega o JSON gerado por sync_processos.py e
+responde consultas de filtro, ordenação e paginação no servidor, evitando que
+o navegador precise baixar e filtrar a base inteira.
+
+Índices mantidos em memória:
+- hash por protocolo e por placa (placa e placa_terceiro);
+- ordenados por datas (cadastro, entrega, limite de autorização) e dias_aberto;
+- bitmaps (inteiros Python usados como bitset) por situacao_sga, tipo e criticidade.
+
+Uso:
+    python scripts/read_api.py --porta 8780 --arquivo public/data/processos.json
+
+    GET /api/processos?criticidade=Crítico,Atenção&tipo=ASSOCIADO
+                      &dias_min=30&cadastro_de=01/01/2026
+                      &ordenar=dias_aberto&ordem=desc&pagina=1&por_pagina=50
+    GET /api/metadata
+    GET /api/busca?q=joao silva&limite=20
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from config import load_config
+from jsonlib import loads
+from search_index import SearchIndex, index_path
+from snapshot_diff import MANIFEST_NAME, load_snapshot
+from sync_processos import OUTPUT_FILE, PATCH_DIR, parse_date
+
+# Campos com bitmap por valor (filtro por igualdade, múltiplos valores separados por vírgula)
+CATEGORY_FIELDS = ("situacao_sga", "tipo", "criticidade")
+
+# Campos com índice ordenado (filtro por faixa e ordenação)
+DATE_FIELDS = ("data_cadastro", "data_entrega", "data_limite_autorizacao")
+SORTED_FIELDS = DATE_FIELDS + ("dias_aberto",)
+
+# Parâmetros de faixa: nome -> (campo, limite)
+RANGE_PARAMS = {
+    "dias_min": ("dias_aberto", "min"),
+    "dias_max": ("dias_aberto", "max"),
+    "cadastro_de": ("data_cadastro", "min"),
+    "cadastro_ate": ("data_cadastro", "max"),
+    "entrega_de": ("data_entrega", "min"),
+    "entrega_ate": ("data_entrega", "max"),
+}
+
+MAX_POR_PAGINA = 500
+
+
+class QueryError(ValueError):
+    """Parâmetro de consulta inválido (vira HTTP 400)."""
+
+
+def _parse_int(value):
+    try:
+        return int(float(value))
+    except (ValueError, TypeError):
+        return None
+
+
+def _sort_key(field, value):
+    if field == "dias_aberto":
+        return _parse_int(value)
+    dt = parse_date(value)
+    return dt.toordinal() if dt else None
+
+
+def _bits(ids):
+    """Monta o bitset a partir de uma sequência de ids (via bytearray, O(k + n/8))."""
+    buf = bytearray()
+    for i in ids:
+        byte = i >> 3
+        if byte >= len(buf):
+            buf.extend(bytes(byte + 1 - len(buf)))
+        buf[byte] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+class ProcessoIndex:
+    """Índices em memória sobre a lista de processos."""
+
+    def __init__(self, data, version):
+        self.data = data
+        self.version = version
+        self.processos = data.get("processos", [])
+        self.search = None
+        self.all_mask = (1 << len(self.processos)) - 1
+
+        self.by_protocolo = defaultdict(list)
+        self.by_placa = defaultdict(list)
+        category_ids = {field: defaultdict(list) for field in CATEGORY_FIELDS}
+        sorted_entries = {field: [] for field in SORTED_FIELDS}
+
+        for i, p in enumerate(self.processos):
+            protocolo = p.get("protocolo", "").strip()
+            if protocolo:
+                self.by_protocolo[protocolo].append(i)
+            for campo in ("placa", "placa_terceiro"):
+                placa = p.get(campo, "").strip().upper()
+                if placa:
+                    ids = self.by_placa[placa]
+                    if not ids or ids[-1] != i:
+                        ids.append(i)
+            for field in CATEGORY_FIELDS:
+                category_ids[field][p.get(field, "").strip()].append(i)
+            for field in SORTED_FIELDS:
+                key = _sort_key(field, p.get(field, ""))
+                if key is not None:
+                    sorted_entries[field].append((key, i))
+
+        self.bitmaps = {
+            field: {value: _bits(ids) for value, ids in by_value.items()}
+            for field, by_value in category_ids.items()
+        }
+
+        # Para cada campo ordenado: chaves e ids em arrays paralelos
+        self.sorted_keys = {}
+        self.sorted_ids = {}
+        self.missing_ids = {}
+        for field, entries in sorted_entries.items():
+            entries.sort()
+            self.sorted_keys[field] = [k for k, _ in entries]
+            self.sorted_ids[field] = [i for _, i in entries]
+            indexed = set(self.sorted_ids[field])
+            self.missing_ids[field] = [i for i in range(len(self.processos)) if i not in indexed]
+
+    def _range_mask(self, field, low=None, high=None):
+        keys = self.sorted_keys[field]
+        start = bisect_left(keys, low) if low is not None else 0
+        end = bisect_right(keys, high) if high is not None else len(keys)
+        return _bits(self.sorted_ids[field][start:end])
+
+    def _filter_mask(self, params):
+        mask = self.all_mask
+
+        for field in CATEGORY_FIELDS:
+            if field in params:
+                values = [v.strip() for v in params[field].split(",")]
+                mask &= _bits_or(self.bitmaps[field].get(v, 0) for v in values)
+
+        if "protocolo" in params:
+            mask &= _bits(self.by_protocolo.get(params["protocolo"].strip(), ()))
+        if "placa" in params:
+            mask &= _bits(self.by_placa.get(params["placa"].strip().upper(), ()))
+
+        ranges = defaultdict(dict)
+        for name, (field, bound) in RANGE_PARAMS.items():
+            if name in params:
+                key = _sort_key(field, params[name])
+                if key is None:
+                    raise QueryError(f"valor inválido para {name}: {params[name]!r}")
+                ranges[field][bound] = key
+        for field, bounds in ranges.items():
+            mask &= self._range_mask(field, bounds.get("min"), bounds.get("max"))
+
+        return mask
+
+    def query(self, params):
+        """Executa filtro + ordenação + paginação; retorna o dict de resposta."""
+        try:
+            pagina = max(1, int(params.get("pagina", 1)))
+            por_pagina = min(MAX_POR_PAGINA, max(1, int(params.get("por_pagina", 50))))
+        except ValueError:
+            raise QueryError("pagina e por_pagina devem ser inteiros")
+
+        ordenar = params.get("ordenar", "")
+        if ordenar and ordenar not in SORTED_FIELDS:
+            raise QueryError(f"ordenação não suportada: {ordenar!r}")
+        descending = params.get("ordem", "asc") == "desc"
+
+        mask = self._filter_mask(params)
+        total = mask.bit_count()
+        offset = (pagina - 1) * por_pagina
+        wanted = offset + por_pagina
+
+        # Bitset em bytes: teste de pertinência O(1) durante a varredura ordenada
+        flags = mask.to_bytes((len(self.processos) + 7) // 8, "little")
+
+        def selected(i):
+            return flags[i >> 3] >> (i & 7) & 1
+
+        if ordenar:
+            ids = self.sorted_ids[ordenar]
+            ordered = reversed(ids) if descending else iter(ids)
+            # Registros sem valor no campo vão para o final
+            missing = self.missing_ids[ordenar]
+        else:
+            ordered = range(len(self.processos))
+            missing = ()
+
+        page = []
+        seen = 0
+        for source in (ordered, missing):
+            for i in source:
+                if not selected(i):
+                    continue
+                if seen >= offset:
+                    page.append(self.processos[i])
+                seen += 1
+                if seen >= wanted:
+                    break
+            if seen >= wanted:
+                break
+
+        return {
+            "total": total,
+            "pagina": pagina,
+            "por_pagina": por_pagina,
+            "processos": page,
+        }
+
+
+def search_payload(index, params):
+    """Resposta de /api/busca: processos ranqueados pelo índice de busca."""
+    if index.search is None:
+        raise QueryError("índice de busca indisponível para este arquivo")
+    consulta = params.get("q", "").strip()
+    if not consulta:
+        raise QueryError("parâmetro q é obrigatório")
+    try:
+        limite = min(MAX_POR_PAGINA, max(1, int(params.get("limite", 20))))
+    except ValueError:
+        raise QueryError("limite deve ser inteiro")
+
+    resultados = index.search.search(consulta, limite)
+    return {
+        "total": len(resultados),
+        "processos": [dict(index.processos[i], score=round(score, 3)) for i, score in resultados],
+    }
+
+
+def _bits_or(masks):
+    result = 0
+    for m in masks:
+        result |= m
+    return result
+
+
+class DataUnavailable(Exception):
+    """Não há dados para servir (arquivo ausente e nenhum snapshot publicado)."""
+
+
+class IndexHolder:
+    """
+    Mantém o índice atual e recarrega quando o arquivo de dados ou o índice de
+    busca muda.
+
+    Sem o arquivo de dados (ele não é versionado, então falta num checkout
+    novo), serve o snapshot reconstruído da base + patches em `patch_dir`.
+    """
+
+    def __init__(self, path, patch_dir=PATCH_DIR):
+        self.path = path
+        self.patch_dir = patch_dir
+        self.search_path = index_path(path)
+        self.lock = threading.Lock()
+        self.source = None
+        self.search_mtime = None
+        self.digest = None
+        self.index = None
+
+    def _source(self):
+        """(origem, mtime) dos dados: o arquivo local ou o manifesto dos patches."""
+        try:
+            return "arquivo", os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            pass
+        try:
+            return "patches", os.stat(os.path.join(self.patch_dir, MANIFEST_NAME)).st_mtime_ns
+        except FileNotFoundError:
+            raise DataUnavailable(f"{self.path} não encontrado e nenhum snapshot publicado em {self.patch_dir}")
+
+    def _load(self, origem):
+        if origem == "arquivo":
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            return hashlib.sha256(raw).hexdigest(), loads(raw)
+        with open(os.path.join(self.patch_dir, MANIFEST_NAME), "rb") as f:
+            digest = "patches-" + hashlib.sha256(f.read()).hexdigest()
+        return digest, load_snapshot(self.patch_dir)
+
+    def get(self):
+        source = self._source()
+        try:
+            search_mtime = os.stat(self.search_path).st_mtime_ns
+        except FileNotFoundError:
+            search_mtime = None
+        with self.lock:
+            if source != self.source:
+                try:
+                    digest, data = self._load(source[0])
+                except (OSError, ValueError, LookupError) as e:
+                    raise DataUnavailable(f"não foi possível carregar os dados: {e}") from e
+                self.digest = digest
+                self.index = ProcessoIndex(data, digest[-16:])
+                self.source = source
+                self.search_mtime = -1
+            if search_mtime != self.search_mtime:
+                self.index.search = self._load_search()
+                self.search_mtime = search_mtime
+            return self.index
+
+    def _load_search(self):
+        try:
+            search = SearchIndex.load(self.search_path)
+        except (OSError, ValueError):
+            return None
+        # Índice gerado para outro arquivo de dados (a sincronização grava os
+        # dados antes do índice): ignora até o índice correspondente ser gravado
+        return search if search.dados_sha256 == self.digest else None
+
+
+def make_handler(holder):
+    class ReadApiHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                index = holder.get()
+            except DataUnavailable as e:
+                self._send_json(503, {"erro": str(e)})
+                return
+
+            etag = '"{}-{}"'.format(
+                index.version,
+                hashlib.sha256(f"{url.path}?{sorted(params.items())}".encode("utf-8")).hexdigest()[:16],
+            )
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            try:
+                if url.path == "/api/processos":
+                    payload = index.query(params)
+                elif url.path == "/api/busca":
+                    payload = search_payload(index, params)
+                elif url.path == "/api/metadata":
+                    payload = {
+                        "metadata": index.data.get("metadata", {}),
+                        "analysis": index.data.get("analysis", {}),
+                    }
+                else:
+                    self._send_json(404, {"erro": "rota não encontrada"})
+                    return
+            except QueryError as e:
+                self._send_json(400, {"erro": str(e)})
+                return
+
+            self._send_json(200, payload, etag)
+
+        def _send_json(self, code, payload, etag=None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReadApiHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API local de leitura dos processos.")
+    parser.add_argument("--arquivo", default=OUTPUT_FILE, help=f"JSON gerado pela sincronização (padrão: {OUTPUT_FILE})")
+    parser.add_argument("--patches", default=PATCH_DIR,
+                        help=f"patches publicados, usados quando o arquivo não existe (padrão: {PATCH_DIR})")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=load_config()["porta_api"])
+    args = parser.parse_args(argv)
+
+    holder = IndexHolder(args.arquivo, args.patches)
+    try:
+        index = holder.get()
+        origem = args.arquivo if holder.source[0] == "arquivo" else f"{args.patches} (base + patches)"
+        print(f"{len(index.processos)} processos indexados de {origem}")
+    except DataUnavailable as e:
+        print(f"Aviso: {e}; respondendo 503 até os dados existirem")
+
+    server = ThreadingHTTPServer((args.host, args.porta), make_handler(holder))
+    print(f"API de leitura em http://{args.host}:{args.porta}/api/processos")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServiço encerrado.")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
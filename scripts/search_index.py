@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Índice de busca textual e aproximada dos processos do Gestão Segura.
+
+Gerado pela sincronização ao lado do JSON de dados (processos.search.json):
+- nomes (associado / Nome / nome_terceiro) viram tokens normalizados, sem
+  acentos, com listas invertidas e vocabulário ordenado para busca por prefixo;
+- placas e protocolos são procurados primeiro por igualdade ou prefixo (hash e
+  lista ordenada das chaves); sem acerto, por trigramas, permitindo achar
+  valores digitados com erro (ex.: "TGL6F34" encontra "TGL6E34"). Trigramas
+  muito frequentes (como o prefixo "2026200" comum a todos os protocolos) são
+  ignorados na geração de candidatos, para a consulta não percorrer a base.
+
+As listas de ids são gravadas com codificação delta para manter o arquivo
+compacto. Os ids são as posições dos registros na lista "processos"; o índice
+guarda o SHA-256 do arquivo de dados para o qual foi gerado, e quem o carrega
+deve conferir que os dois correspondem.
+
+Uso:
+    python scripts/search_index.py "joao da silva"
+    python scripts/search_index.py TGL6F34 --limite 5
+"""
+import argparse
+import hashlib
+import heapq
+import os
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+# Campos indexados por palavras (nomes)
+TEXT_FIELDS = ("associado", "Nome", "nome_terceiro")
+
+# Campos indexados por trigramas (identificadores)
+NGRAM_FIELDS = ("placa", "placa_terceiro", "protocolo", "Placa", "Protocolo GS")
+
+INDEX_VERSION = 2
+
+# Limites da expansão de termos na consulta
+MAX_PREFIX_EXPANSION = 50
+MIN_FUZZY_SIMILARITY = 0.5
+MIN_NGRAM_SIMILARITY = 0.4
+
+# Trigramas com listas maiores que isso não geram candidatos na busca aproximada
+MAX_NGRAM_POSTINGS = 2000
+
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def fold(text):
+    """Remove acentos e passa para minúsculas."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """Quebra um texto em tokens alfanuméricos normalizados."""
+    return _TOKEN_RE.findall(fold(text)) if text else []
+
+
+def compact_key(text):
+    """Normaliza identificadores (placa/protocolo): só letras e dígitos."""
+    return "".join(_TOKEN_RE.findall(fold(text))) if text else ""
+
+
+def trigrams(value):
+    """Conjunto de trigramas com marcadores de início e fim."""
+    padded = f"${value}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(common, size_a, size_b):
+    return 2.0 * common / (size_a + size_b) if size_a + size_b else 0.0
+
+
+def _delta_encode(ids):
+    out = []
+    prev = 0
+    for i in ids:
+        out.append(i - prev)
+        prev = i
+    return out
+
+
+def _delta_decode(deltas):
+    out = []
+    acc = 0
+    for d in deltas:
+        acc += d
+        out.append(acc)
+    return out
+
+
+def file_digest(path):
+    """SHA-256 (hex) do conteúdo de um arquivo."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_index(processos, dados_sha256=None):
+    """Constrói o índice serializável a partir da lista de processos."""
+    token_postings = defaultdict(list)
+    gram_postings = defaultdict(lambda: defaultdict(list))
+    keys = {field: [] for field in NGRAM_FIELDS}
+
+    for i, p in enumerate(processos):
+        for field in TEXT_FIELDS:
+            for token in tokenize(p.get(field, "")):
+                ids = token_postings[token]
+                if not ids or ids[-1] != i:
+                    ids.append(i)
+        for field in NGRAM_FIELDS:
+            key = compact_key(p.get(field, ""))
+            keys[field].append(key)
+            if key:
+                for gram in trigrams(key):
+                    gram_postings[field][gram].append(i)
+
+    vocab = sorted(token_postings)
+    return {
+        "versao": INDEX_VERSION,
+        "total": len(processos),
+        "dados_sha256": dados_sha256,
+        "vocab": vocab,
+        "postings": [_delta_encode(token_postings[t]) for t in vocab],
+        # Chave compacta de cada registro, por campo ("" quando vazio)
+        "chaves": {field: keys[field] for field in gram_postings},
+        "ngram": {
+            field: {gram: _delta_encode(ids) for gram, ids in sorted(grams.items())}
+            for field, grams in gram_postings.items()
+        },
+    }
+
+
+def index_path(data_file):
+    """Caminho do índice ao lado do JSON de dados (processos.json -> processos.search.json)."""
+    base, _ = os.path.splitext(data_file)
+    return f"{base}.search.json"
+
+
+def save_index(processos, data_file):
+    """Gera e grava o índice de busca ao lado do arquivo de dados (já gravado)."""
+    from serializer import write_json
+
+    path = index_path(data_file)
+    index = build_index(processos, file_digest(data_file))
+    # Gravação atômica: a API de leitura nunca vê um índice pela metade
+    write_json(path, index, "compact", stream_key=None)
+    print(f"Índice de busca salvo em {path} ({os.path.getsize(path):,} bytes)")
+    return path
+
+
+class SearchIndex:
+    """Consulta ranqueada sobre o índice serializado."""
+
+    def __init__(self, data):
+        if data.get("versao") != INDEX_VERSION:
+            raise ValueError(f"versão de índice não suportada: {data.get('versao')!r}")
+        self.total = data["total"]
+        self.dados_sha256 = data["dados_sha256"]
+        self.vocab = data["vocab"]
+        self.postings = [_delta_decode(d) for d in data["postings"]]
+
+        # Trigramas do vocabulário, para corrigir tokens digitados com erro
+        self.vocab_grams = defaultdict(list)
+        for term_id, term in enumerate(self.vocab):
+            for gram in trigrams(term):
+                self.vocab_grams[gram].append(term_id)
+
+        self.keys = data["chaves"]
+        self.key_ids = {}
+        self.sorted_keys = {}
+        for field, keys in self.keys.items():
+            ids_by_key = defaultdict(list)
+            for i, key in enumerate(keys):
+                if key:
+                    ids_by_key[key].append(i)
+            self.key_ids[field] = ids_by_key
+            self.sorted_keys[field] = sorted(ids_by_key)
+
+        self.ngram = {
+            field: {gram: _delta_decode(d) for gram, d in grams.items()}
+            for field, grams in data["ngram"].items()
+        }
+
+    @classmethod
+    def load(cls, path):
+        from jsonlib import load_file
+        return cls(load_file(path))
+
+    def _term_matches(self, token):
+        """Retorna [(term_id, peso)] para um token da consulta."""
+        matches = {}
+        start = bisect_left(self.vocab, token)
+        if start < len(self.vocab) and self.vocab[start] == token:
+            matches[start] = 3.0
+        for term_id in range(start, min(start + MAX_PREFIX_EXPANSION, len(self.vocab))):
+            if not self.vocab[term_id].startswith(token):
+                break
+            matches.setdefault(term_id, 2.0)
+
+        if not matches and len(token) >= 3:
+            grams = trigrams(token)
+            common = defaultdict(int)
+            for gram in grams:
+                for term_id in self.vocab_grams.get(gram, ()):
+                    common[term_id] += 1
+            for term_id, count in common.items():
+                # Um termo de n caracteres tem até n trigramas (com marcadores)
+                sim = dice(count, len(grams), len(self.vocab[term_id]))
+                if sim >= MIN_FUZZY_SIMILARITY:
+                    matches[term_id] = sim
+        return matches.items()
+
+    def _key_candidates(self, key):
+        """Ids com identificador igual à chave ou começando por ela."""
+        found = set()
+        for field, ids_by_key in self.key_ids.items():
+            keys = self.sorted_keys[field]
+            start = bisect_left(keys, key)
+            for other in keys[start:start + MAX_PREFIX_EXPANSION]:
+                if not other.startswith(key):
+                    break
+                found.update(ids_by_key[other])
+        return found
+
+    def _ngram_scores(self, key):
+        grams = trigrams(key)
+        candidates = self._key_candidates(key)
+        best = defaultdict(float)
+        if candidates:
+            for i in candidates:
+                for keys in self.keys.values():
+                    other = keys[i]
+                    if other.startswith(key):
+                        other_grams = trigrams(other)
+                        best[i] = max(best[i], dice(len(grams & other_grams), len(grams), len(other_grams)))
+            return best
+
+        for field, index in self.ngram.items():
+            # Só trigramas pouco frequentes geram candidatos
+            common = defaultdict(int)
+            skipped = 0
+            for gram in grams:
+                ids = index.get(gram, ())
+                if len(ids) > MAX_NGRAM_POSTINGS:
+                    skipped += 1
+                    continue
+                for i in ids:
+                    common[i] += 1
+
+            keys = self.keys[field]
+            for i, count in common.items():
+                # Limite superior da similaridade (o registro tem pelo menos `count` trigramas)
+                if dice(count + skipped, len(grams), count + skipped) < MIN_NGRAM_SIMILARITY:
+                    continue
+                other_grams = trigrams(keys[i])
+                if skipped:
+                    count = len(grams & other_grams)
+                sim = dice(count, len(grams), len(other_grams))
+                if sim >= MIN_NGRAM_SIMILARITY and sim > best[i]:
+                    best[i] = sim
+        return best
+
+    def search(self, query, limit=20):
+        """
+        Busca ranqueada. Retorna [(id, score)] em ordem decrescente de score.
+
+        Nomes pontuam por token (exato > prefixo > aproximado); placas e
+        protocolos pontuam pela similaridade de trigramas.
+        """
+        scores = defaultdict(float)
+
+        for token in tokenize(query):
+            best = defaultdict(float)
+            for term_id, weight in self._term_matches(token):
+                for i in self.postings[term_id]:
+                    if weight > best[i]:
+                        best[i] = weight
+            for i, weight in best.items():
+                scores[i] += weight
+
+        key = compact_key(query)
+        if len(key) >= 3:
+            for i, sim in self._ngram_scores(key).items():
+                scores[i] += 3.0 * sim
+
+        return heapq.nsmallest(limit, scores.items(), key=lambda x: (-x[1], x[0]))
+
+
+def main(argv=None):
+    from sync_processos import OUTPUT_FILE
+
+    parser = argparse.ArgumentParser(description="Consulta o índice de busca dos processos.")
+    parser.add_argument("consulta")
+    parser.add_argument("--arquivo", default=OUTPUT_FILE, help=f"JSON de dados (padrão: {OUTPUT_FILE})")
+    parser.add_argument("--limite", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    from jsonlib import load_file
+
+    index = SearchIndex.load(index_path(args.arquivo))
+    processos = load_file(args.arquivo)["processos"]
+
+    for i, score in index.search(args.consulta, args.limite):
+        p = processos[i]
+        nome = p.get("associado") or p.get("Nome", "")
+        placa = p.get("placa") or p.get("Placa", "")
+        protocolo = p.get("protocolo") or p.get("Protocolo GS", "")
+        print(f"{score:5.2f}  {protocolo:<22} {placa:<8} {nome}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
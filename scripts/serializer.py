@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Gravação dos JSON publicados pelo Gestão Segura.
+
+Grava o documento de saída transmitindo a lista grande ("processos") registro
+a registro para um arquivo com buffer, em vez de montar a string inteira em
+memória como json.dump(..., indent=2) faz.
+
+Dois formatos:
+- "pretty": indentação de 2 espaços, amigável para diffs nos commits;
+- "compact": sem espaços, para servir.
+
+Os registros são codificados com orjson quando instalado; o caminho só com a
+biblioteca padrão produz exatamente os mesmos bytes, tanto no formato pretty
+(igual a json.dump(output, ensure_ascii=False, indent=2)) quanto no compact
+(igual a separators=(",", ":")).
+"""
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FORMATS = ("pretty", "compact")
+
+# Tamanho do buffer de escrita
+BUFFER_SIZE = 1 << 20
+
+
+def _encode_stdlib(value, pretty):
+    if pretty:
+        return json.dumps(value, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode(value, pretty):
+    """Codifica um valor em bytes UTF-8 (orjson se disponível)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except TypeError:
+            pass
+    return _encode_stdlib(value, pretty)
+
+
+def _indent(encoded, prefix):
+    """Recua as linhas seguintes à primeira (o valor já está dentro de um container)."""
+    return encoded.replace(b"\n", b"\n" + prefix)
+
+
+def write_stream(f, output, pretty=True, stream_key="processos", encoder=encode):
+    """Escreve o dict `output` em f, transmitindo output[stream_key] item a item."""
+    if not output:
+        f.write(b"{}")
+        return
+
+    if pretty:
+        open_obj, item_sep, key_sep, close_obj = b"{\n  ", b",\n  ", b": ", b"\n}"
+    else:
+        open_obj, item_sep, key_sep, close_obj = b"{", b",", b":", b"}"
+
+    f.write(open_obj)
+    for n, (key, value) in enumerate(output.items()):
+        if n:
+            f.write(item_sep)
+        f.write(_encode_stdlib(key, pretty) + key_sep)
+
+        if key == stream_key and isinstance(value, list) and value:
+            f.write(b"[\n    " if pretty else b"[")
+            for i, item in enumerate(value):
+                if i:
+                    f.write(b",\n    " if pretty else b",")
+                encoded = encoder(item, pretty)
+                f.write(_indent(encoded, b"    ") if pretty else encoded)
+            f.write(b"\n  ]" if pretty else b"]")
+        else:
+            # Cabeçalho pequeno (metadata/analysis): biblioteca padrão
+            encoded = _encode_stdlib(value, pretty)
+            f.write(_indent(encoded, b"  ") if pretty else encoded)
+    f.write(close_obj)
+
+
+def write_json(path, output, fmt="pretty", stream_key="processos"):
+    """
+    Grava `output` em `path` de forma atômica (arquivo temporário + rename),
+    para que leitores concorrentes nunca vejam um arquivo pela metade.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"formato de saída inválido: {fmt!r} (use {' ou '.join(FORMATS)})")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb", buffering=BUFFER_SIZE) as f:
+        write_stream(f, output, pretty=(fmt == "pretty"), stream_key=stream_key)
+    os.replace(tmp_path, path)
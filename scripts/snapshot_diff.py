@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Publicação diferencial dos dados do Gestão Segura.
+
+A cada sincronização, compara o snapshot anterior com o novo e grava um patch
+JSON (RFC 6902) pequeno em public/data/patches/, para que o navegador que já
+tem uma versão em cache aplique só a diferença em vez de baixar o arquivo todo.
+
+- Os processos são comparados por chave (protocolo + ocorrência), com índices
+  hash, em tempo linear: incluídos, removidos e campos alterados.
+- metadata e analysis são comparados recursivamente (só os campos que mudaram).
+- Mantém um snapshot base e no máximo MAX_PATCHES patches; ao estourar o
+  limite, o snapshot atual vira a nova base e os patches antigos são apagados.
+  O mesmo acontece quando o patch seria grande demais em relação à base
+  (MAX_PATCH_RATIO) ou quando a planilha foi reordenada (o patch substituiria
+  a lista inteira).
+
+Só a base e os patches são versionados: o snapshot completo atual
+(processos.json) é gerado para as ferramentas locais e, quando não existe
+(checkout novo), é reconstruído com load_snapshot.
+
+Estrutura publicada:
+    patches/manifest.json   versão atual, base e lista de patches
+    patches/base-<v>.json   snapshot completo da versão v
+    patches/patch-<v>.json  operações que levam a versão v-1 à versão v
+"""
+import json
+import os
+
+MAX_PATCHES = 30
+
+# Um patch maior que essa fração da base (ou patches pendentes somando mais
+# que a base) não compensa: o snapshot vira uma nova base
+MAX_PATCH_RATIO = 0.5
+MANIFEST_NAME = "manifest.json"
+
+
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def record_keys(processos):
+    """Chave estável de cada processo: protocolo + número da ocorrência (há protocolos repetidos)."""
+    seen = {}
+    keys = []
+    for p in processos:
+        protocolo = p.get("protocolo", "")
+        n = seen.get(protocolo, 0)
+        seen[protocolo] = n + 1
+        keys.append(f"{protocolo}#{n}")
+    return keys
+
+
+def diff_values(old, new, path, ops):
+    """Diferença recursiva entre dicts; listas e escalares são substituídos inteiros."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            elif old[key] != value:
+                diff_values(old[key], value, child, ops)
+    elif old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def diff_processos(old, new, path="/processos"):
+    """
+    Operações que transformam a lista old na lista new.
+
+    Se a ordem relativa dos processos em comum mudou (planilha reordenada), a
+    lista é substituída inteira.
+    """
+    old_keys = record_keys(old)
+    new_keys = record_keys(new)
+    old_index = {k: i for i, k in enumerate(old_keys)}
+    new_index = {k: i for i, k in enumerate(new_keys)}
+
+    common_old = [k for k in old_keys if k in new_index]
+    common_new = [k for k in new_keys if k in old_index]
+    if common_old != common_new:
+        return [{"op": "replace", "path": path, "value": new}], {"reordenado": True}
+
+    ops = []
+    removidos = [i for i, k in enumerate(old_keys) if k not in new_index]
+    for i in reversed(removidos):
+        ops.append({"op": "remove", "path": f"{path}/{i}"})
+
+    incluidos = 0
+    for j, k in enumerate(new_keys):
+        if k not in old_index:
+            ops.append({"op": "add", "path": f"{path}/{j}", "value": new[j]})
+            incluidos += 1
+
+    alterados = 0
+    for j, k in enumerate(new_keys):
+        i = old_index.get(k)
+        if i is not None and old[i] != new[j]:
+            diff_values(old[i], new[j], f"{path}/{j}", ops)
+            alterados += 1
+
+    return ops, {"incluidos": incluidos, "removidos": len(removidos), "alterados": alterados}
+
+
+def diff_snapshots(old, new):
+    """Patch completo entre dois snapshots (metadata, analysis e processos)."""
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"/{_escape(key)}"})
+    resumo = {}
+    for key, value in new.items():
+        if key not in old:
+            ops.append({"op": "add", "path": f"/{_escape(key)}", "value": value})
+        elif key == "processos":
+            processos_ops, resumo = diff_processos(old[key], value)
+            ops.extend(processos_ops)
+        else:
+            diff_values(old[key], value, f"/{_escape(key)}", ops)
+    return ops, resumo
+
+
+def _resolve(doc, path):
+    tokens = [t.replace("~1", "/").replace("~0", "~") for t in path.split("/")[1:]]
+    parent = doc
+    for token in tokens[:-1]:
+        parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+    return parent, tokens[-1]
+
+
+def apply_patch(doc, ops):
+    """Aplica as operações add/remove/replace geradas aqui (modifica doc)."""
+    for op in ops:
+        parent, token = _resolve(doc, op["path"])
+        if isinstance(parent, list):
+            index = len(parent) if token == "-" else int(token)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = op["value"]
+        elif op["op"] == "remove":
+            del parent[token]
+        else:
+            parent[token] = op["value"]
+    return doc
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_manifest(patch_dir):
+    path = os.path.join(patch_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_snapshot(patch_dir):
+    """Reconstrói o snapshot atual aplicando os patches à base (None sem manifesto)."""
+    manifest = load_manifest(patch_dir)
+    if not manifest:
+        return None
+    from jsonlib import load_file
+
+    doc = load_file(os.path.join(patch_dir, manifest["base"]["arquivo"]))
+    for patch in manifest["patches"]:
+        apply_patch(doc, load_file(os.path.join(patch_dir, patch["arquivo"])))
+    if doc.get("metadata", {}).get("versao") != manifest["versao_atual"]:
+        raise ValueError(f"patches em {patch_dir} não levam a base à versão {manifest['versao_atual']}")
+    return doc
+
+
+def _new_base(patch_dir, manifest, output, version):
+    """Grava o snapshot como nova base e remove a base e os patches anteriores."""
+    if manifest:
+        obsolete = [manifest["base"]["arquivo"]] + [p["arquivo"] for p in manifest["patches"]]
+        for name in obsolete:
+            path = os.path.join(patch_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    from serializer import write_json
+
+    base_name = f"base-{version}.json"
+    write_json(os.path.join(patch_dir, base_name), output, "compact")
+    return {"versao_atual": version, "base": {"versao": version, "arquivo": base_name}, "patches": []}
+
+
+def _base_renewal_reason(patch_dir, manifest, patch_bytes, resumo):
+    """Motivo para gravar uma base nova em vez do patch (None: o patch compensa)."""
+    if resumo.get("reordenado"):
+        return "planilha reordenada"
+    try:
+        base_bytes = os.path.getsize(os.path.join(patch_dir, manifest["base"]["arquivo"]))
+    except OSError:
+        return "base ausente"
+    if patch_bytes > MAX_PATCH_RATIO * base_bytes:
+        return f"patch de {patch_bytes:,} bytes para uma base de {base_bytes:,}"
+    if patch_bytes + sum(p["bytes"] for p in manifest["patches"]) > base_bytes:
+        return "patches pendentes maiores que a base"
+    return None
+
+
+def publish(previous, output, patch_dir):
+    """
+    Publica o novo snapshot e retorna o número da versão.
+
+    previous é o snapshot publicado anteriormente (ou None). output recebe
+    metadata["versao"] antes de ser diffado/gravado.
+    """
+    os.makedirs(patch_dir, exist_ok=True)
+    manifest = load_manifest(patch_dir)
+    prev_version = (previous or {}).get("metadata", {}).get("versao")
+
+    # Sem histórico consistente: recomeça com uma base nova
+    if not manifest or prev_version != manifest["versao_atual"]:
+        version = (manifest["versao_atual"] + 1) if manifest else 1
+        output["metadata"]["versao"] = version
+        manifest = _new_base(patch_dir, manifest, output, version)
+        print(f"Nova base de patches: versão {version}")
+    else:
+        version = prev_version + 1
+        output["metadata"]["versao"] = version
+        if len(manifest["patches"]) >= MAX_PATCHES:
+            manifest = _new_base(patch_dir, manifest, output, version)
+            print(f"Base de patches renovada: versão {version}")
+        else:
+            ops, resumo = diff_snapshots(previous, output)
+            patch = json.dumps(ops, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            motivo = _base_renewal_reason(patch_dir, manifest, len(patch), resumo)
+            if motivo:
+                manifest = _new_base(patch_dir, manifest, output, version)
+                print(f"Base de patches renovada ({motivo}): versão {version}")
+            else:
+                patch_name = f"patch-{version}.json"
+                with open(os.path.join(patch_dir, patch_name), "wb") as f:
+                    f.write(patch)
+                manifest["versao_atual"] = version
+                manifest["patches"].append({
+                    "de": version - 1,
+                    "para": version,
+                    "arquivo": patch_name,
+                    "operacoes": len(ops),
+                    "bytes": len(patch),
+                    **resumo,
+                })
+                print(f"Patch {patch_name}: {len(ops)} operações {resumo}")
+
+    _write_json(os.path.join(patch_dir, MANIFEST_NAME), manifest)
+    return version
@@ -4,19 +4,21 @@ Script de sincronização de dados do Google Sheets para o Gestão Segura.
 Lê a planilha "Acompanhamento_Processos_Atualizado 2026" via CSV público e gera JSON para o frontend.
 Não requer credenciais — a planilha deve estar compartilhada como "Qualquer pessoa com o link".
 """
-import csv
-import io
-import json
 import os
-import urllib.request
 from datetime import datetime, date
 from collections import defaultdict
 
-# Configurações
-SPREADSHEET_ID = "15AS3FlLpmRQwjRCv11dIR9pgE14c2u3XyrFPPMcaFJo"
-SHEET_NAME = "Dados"
+from config import load_config
+
+# Configurações (padrões em config.py, sobrescritas por gestaosegura.json)
+_config = load_config()
+SPREADSHEET_ID = _config["spreadsheet_id"]
+SHEET_NAME = _config["sheet_name"]
 CSV_URL = f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/gviz/tq?tqx=out:csv&sheet={SHEET_NAME}"
-OUTPUT_FILE = "public/data/processos.json"
+OUTPUT_FILE = _config["output_file"]
+PATCH_DIR = _config["patch_dir"]
+OUTPUT_FORMAT = _config["formato_saida"]
+REJECTED_FILE = _config["arquivo_rejeitados"]
 
 # Cabeçalhos esperados (mapeamento posicional)
 HEADERS = [
@@ -29,23 +31,78 @@ HEADERS = [
     "criticidade", "parecer_coordenacao"
 ]
 
+# Colunas de data (DD/MM/AAAA) validadas no processamento
+DATE_FIELDS = (
+    "data_cadastro", "abertura_processo", "data_limite_autorizacao",
+    "data_autorizacao_reparos", "data_entrega", "data_descricao",
+)
+
+# Valores de erro de fórmula da planilha
+FORMULA_ERRORS = ("#VALUE!", "#REF!", "#N/A")
+
+# Prazos de SLA em dias úteis (etapa -> limite)
+SLA_ENTREGA_DIAS_UTEIS = _config["sla_entrega_dias_uteis"]
+
+
+def sla_stages():
+    """Etapas de SLA calculadas em dias úteis para cada processo."""
+    from dias_uteis import SlaStage
+    return [
+        SlaStage("entrega", "data_cadastro", "data_entrega", SLA_ENTREGA_DIAS_UTEIS,
+                 "dias_uteis_entrega", "sla_entrega"),
+    ]
+
+
+def print_banner():
+    """Imprime o cabeçalho da execução."""
+    print(f"SINCRONIZAÇÃO DE DADOS - Gestão Segura 2026 ({datetime.now().strftime('%d/%m/%Y %H:%M:%S')})")
+
+
+def fetch_csv_text(etag=None, last_modified=None):
+    """
+    Busca o CSV bruto da planilha com requisição condicional.
+
+    Retorna (texto, etag, last_modified). O texto é None quando o servidor
+    responde 304 (conteúdo inalterado desde a última busca).
+    """
+    # Importado aqui: urllib.request puxa http.client/email e pesa na inicialização
+    import urllib.error
+    import urllib.request
+
+    headers = {"User-Agent": "Mozilla/5.0"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    req = urllib.request.Request(CSV_URL, headers=headers)
+    try:
+        resp = urllib.request.urlopen(req, timeout=30)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag, last_modified
+        raise
+
+    data = resp.read().decode("utf-8")
+    return data, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
+
+def parse_csv_text(data):
+    """Converte o texto CSV em lista de linhas."""
+    import csv
+    import io
+
+    return list(csv.reader(io.StringIO(data)))
+
 
 def fetch_csv_data():
     """Busca dados da planilha via CSV público."""
-    print("=" * 60)
-    print("SINCRONIZAÇÃO DE DADOS - Gestão Segura 2026")
-    print("=" * 60)
-    print(f"Data: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
-    print()
+    print_banner()
     print("Buscando dados da planilha via CSV público...")
     print(f"URL: {CSV_URL[:80]}...")
 
-    req = urllib.request.Request(CSV_URL, headers={"User-Agent": "Mozilla/5.0"})
-    resp = urllib.request.urlopen(req, timeout=30)
-    data = resp.read().decode("utf-8")
-
-    reader = csv.reader(io.StringIO(data))
-    rows = list(reader)
+    data, _, _ = fetch_csv_text()
+    rows = parse_csv_text(data)
 
     print(f"Linhas recebidas: {len(rows)}")
     return rows
@@ -67,11 +124,11 @@ def parse_date(date_str):
     return None
 
 
-def calculate_dias_aberto(data_cadastro_str):
+def calculate_dias_aberto(data_cadastro_str, today=None):
     """Calcula dias aberto a partir da data de cadastro."""
     dt = parse_date(data_cadastro_str)
     if dt:
-        delta = date.today() - dt
+        delta = (today or date.today()) - dt
         return delta.days
     return None
 
@@ -102,53 +159,93 @@ def calculate_criticidade(dias_reparos_str, dias_aberto):
     return None
 
 
-def process_rows(rows):
-    """Converte as linhas CSV em lista de dicionários."""
+def process_rows(rows, rejected=None, today=None):
+    """
+    Converte as linhas CSV em lista de dicionários.
+
+    Linhas descartadas e campos inválidos são enviados para `rejected`
+    (quarantine.RejectedRows) com o código do motivo. `today` (padrão: a data
+    atual) é a referência de dias_aberto e dos prazos de SLA.
+    """
     print("Processando dados...")
 
     if not rows:
         return []
 
+    if rejected is None:
+        from quarantine import RejectedRows
+        rejected = RejectedRows()
+    today = today or date.today()
+    from valores import MONEY_FIELDS, parse_centavos
+
     # Pular a primeira linha (cabeçalho da planilha com descrição)
     data_rows = rows[1:] if len(rows) > 1 else rows
+    first_line = 2 if len(rows) > 1 else 1
 
     processos = []
-    for row in data_rows:
+    for line, row in enumerate(data_rows, start=first_line):
         if not row or not row[0].strip():
+            if any(cell.strip() for cell in row):
+                rejected.reject("sem_protocolo", line, row)
             continue
 
         # Ignorar linhas que não são dados (cabeçalhos, resumos)
         first_cell = row[0].strip()
-        if first_cell.lower() in ("protocolo", "") or not any(c.isdigit() for c in first_cell):
+        if first_cell.lower() == "protocolo":
             continue
+        if not any(c.isdigit() for c in first_cell):
+            rejected.reject("protocolo_sem_digitos", line, row)
+            continue
+
+        if len(row) < len(HEADERS):
+            rejected.warn("colunas_faltando", line, row, esperado=len(HEADERS), recebido=len(row))
 
         processo = {}
         for i, header in enumerate(HEADERS):
             processo[header] = row[i].strip() if i < len(row) and row[i] else ""
 
+        for field in DATE_FIELDS:
+            value = processo[field]
+            if value and parse_date(value) is None:
+                rejected.reject("data_invalida", line, campo=field, valor=value, protocolo=first_cell)
+        for field in MONEY_FIELDS:
+            value = processo[field]
+            if value and parse_centavos(value) is None:
+                rejected.reject("valor_invalido", line, campo=field, valor=value, protocolo=first_cell)
+
         # Calcular dias_aberto se não estiver preenchido ou tiver erro
-        if not processo["dias_aberto"] or processo["dias_aberto"] in ("", "#VALUE!", "#REF!", "#N/A"):
-            calculated = calculate_dias_aberto(processo["data_cadastro"])
+        if not processo["dias_aberto"] or processo["dias_aberto"] in FORMULA_ERRORS:
+            if processo["dias_aberto"]:
+                rejected.reject("erro_formula", line, campo="dias_aberto", valor=processo["dias_aberto"],
+                                protocolo=first_cell)
+            calculated = calculate_dias_aberto(processo["data_cadastro"], today)
             processo["dias_aberto"] = str(calculated) if calculated is not None else ""
 
         # Calcular criticidade se não estiver preenchida ou tiver erro
-        if not processo["criticidade"] or processo["criticidade"] in ("", "#VALUE!", "#REF!", "#N/A"):
+        if not processo["criticidade"] or processo["criticidade"] in FORMULA_ERRORS:
+            if processo["criticidade"]:
+                rejected.reject("erro_formula", line, campo="criticidade", valor=processo["criticidade"],
+                                protocolo=first_cell)
             dias_aberto_val = None
             try:
                 dias_aberto_val = int(float(processo["dias_aberto"])) if processo["dias_aberto"] else None
             except (ValueError, TypeError):
-                pass
+                rejected.reject("numero_invalido", line, campo="dias_aberto", valor=processo["dias_aberto"],
+                                protocolo=first_cell)
             crit = calculate_criticidade(processo["dias_reparos"], dias_aberto_val)
             processo["criticidade"] = crit if crit else ""
 
         processos.append(processo)
 
+    from dias_uteis import apply_sla
+    apply_sla(processos, sla_stages(), today, rejected)
+
     print(f"Total de registros processados: {len(processos)}")
     return processos
 
 
-def generate_analysis(processos):
-    """Gera estatísticas e análises dos dados."""
+def generate_analysis(processos, today=None):
+    """Gera estatísticas e análises dos dados (`today`: referência do aging)."""
     print("Gerando estatísticas...")
 
     analysis = {
@@ -210,14 +307,21 @@ def generate_analysis(processos):
     analysis["fornecedores"] = dict(analysis["fornecedores"])
     analysis["processos_por_mes"] = dict(sorted(analysis["processos_por_mes"].items()))
 
-    return analysis
+    from valores import aggregate_valores
+    analysis["valores"] = aggregate_valores(processos)
 
+    from dias_uteis import summarize_sla
+    analysis["sla"] = summarize_sla(processos, sla_stages())
 
-def save_data(processos, analysis):
-    """Salva os dados em JSON."""
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    from aging import aging_analysis
+    analysis["envelhecimento"] = aging_analysis(processos, today)
 
-    output = {
+    return analysis
+
+
+def build_output(processos, analysis):
+    """Monta o documento JSON publicado para o frontend."""
+    return {
         "metadata": {
             "ultima_atualizacao": datetime.now().isoformat(),
             "total_processos": analysis["total_processos"],
@@ -228,27 +332,93 @@ def save_data(processos, analysis):
         "processos": processos,
     }
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+
+def load_previous_output():
+    """
+    Lê o snapshot publicado anteriormente, se houver: o arquivo de dados local
+    ou, quando ele falta ou está desatualizado, a base + patches publicados.
+    """
+    from jsonlib import load_file
+    from snapshot_diff import load_manifest, load_snapshot
+
+    try:
+        previous = load_file(OUTPUT_FILE)
+    except (OSError, ValueError):
+        previous = None
+
+    manifest = load_manifest(PATCH_DIR)
+    if manifest and (previous or {}).get("metadata", {}).get("versao") != manifest["versao_atual"]:
+        try:
+            return load_snapshot(PATCH_DIR)
+        except (OSError, ValueError, LookupError) as e:
+            print(f"Aviso: não foi possível reconstruir o snapshot publicado: {e}")
+    return previous
+
+
+def save_data(processos, analysis, fmt=None):
+    """Salva os dados em JSON ("pretty" para commits, "compact" para servir)."""
+    from serializer import write_json
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+
+    previous = load_previous_output()
+    output = build_output(processos, analysis)
+
+    from snapshot_diff import publish
+    publish(previous, output, PATCH_DIR)
+
+    write_json(OUTPUT_FILE, output, fmt or OUTPUT_FORMAT)
 
     file_size = os.path.getsize(OUTPUT_FILE)
     print(f"Dados salvos em {OUTPUT_FILE} ({file_size:,} bytes)")
 
+    from search_index import save_index
+    save_index(processos, OUTPUT_FILE)
+
+
+def print_summary(analysis):
+    """Imprime o resumo final da sincronização."""
+    print("\n" + "=" * 60)
+    print("SINCRONIZAÇÃO CONCLUÍDA COM SUCESSO!")
+    print(f"Total de processos: {analysis['total_processos']}")
+    print(f"Críticos: {analysis['criticidade']['Crítico']}")
+    print(f"Atenção: {analysis['criticidade']['Atenção']}")
+    print(f"Dentro do Prazo: {analysis['criticidade']['Dentro do Prazo']}")
+    print("=" * 60)
+
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sincroniza os processos da planilha para o frontend.")
+    parser.add_argument("--watch", action="store_true",
+                        help="mantém o serviço rodando e sincroniza periodicamente")
+    parser.add_argument("--intervalo", type=int, default=_config["intervalo_watch"],
+                        help="intervalo entre buscas no modo --watch, em segundos (padrão: %(default)s)")
+    parser.add_argument("--porta", type=int, default=_config["porta_watch"],
+                        help="porta do endpoint local de saúde/métricas no modo --watch (0 desativa)")
+    parser.add_argument("--formato", choices=("pretty", "compact"), default=OUTPUT_FORMAT,
+                        help="formato do JSON gerado (padrão: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.watch:
+        from sync_watch import run_watch
+        return run_watch(interval=args.intervalo, port=args.porta, fmt=args.formato)
+
+    from quarantine import RejectedRows
 
-def main():
     try:
         rows = fetch_csv_data()
-        processos = process_rows(rows)
-        analysis = generate_analysis(processos)
-        save_data(processos, analysis)
-
-        print("\n" + "=" * 60)
-        print("SINCRONIZAÇÃO CONCLUÍDA COM SUCESSO!")
-        print(f"Total de processos: {analysis['total_processos']}")
-        print(f"Críticos: {analysis['criticidade']['Crítico']}")
-        print(f"Atenção: {analysis['criticidade']['Atenção']}")
-        print(f"Dentro do Prazo: {analysis['criticidade']['Dentro do Prazo']}")
-        print("=" * 60)
+        today = date.today()
+        with RejectedRows(REJECTED_FILE) as rejected:
+            processos = process_rows(rows, rejected, today)
+        analysis = generate_analysis(processos, today)
+        save_data(processos, analysis, args.formato)
+        print_summary(analysis)
+        rejected.print_report()
         return 0
     except Exception as e:
         print(f"\nERRO NA SINCRONIZAÇÃO: {e}")
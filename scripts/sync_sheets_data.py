@@ -5,7 +5,6 @@ Atualiza automaticamente os dados do site Gestão Segura com informações da pl
 """
 
 import csv
-import json
 import urllib.request
 import urllib.parse
 from datetime import datetime
@@ -44,6 +43,38 @@ COLUNAS_DISPLAY = {
     "Dias úteis para Retorno Análise": "Dias de Retorno"
 }
 
+# Prazos de SLA em dias úteis por etapa
+SLA_SINCRONISMO_DIAS_UTEIS = 5
+SLA_RETORNO_DIAS_UTEIS = 3
+
+def sla_stages():
+    """
+    Etapas de SLA calculadas em dias úteis: Data Aviso -> Data Sincronismo -> Data de Retorno
+    """
+    from dias_uteis import SlaStage
+    return [
+        SlaStage("sincronismo", "Data Aviso", "Data Sincronismo", SLA_SINCRONISMO_DIAS_UTEIS,
+                 "Dias úteis Sincronismo", "SLA Sincronismo"),
+        SlaStage("retorno", "Data Sincronismo", "Data de Retorno", SLA_RETORNO_DIAS_UTEIS,
+                 "Dias úteis Retorno", "SLA Retorno"),
+    ]
+
+def fix_dias_retorno(processos):
+    """
+    Substitui "Dias de Retorno" da planilha pelo valor calculado em dias úteis
+    quando a etapa já foi concluída. A fórmula da planilha quebra (#VALUE!),
+    fica negativa no mesmo dia e não desconta feriados.
+    """
+    corrigidos = 0
+    for processo in processos:
+        if not processo.get('Data de Retorno', '').strip():
+            continue
+        calculado = processo.get('Dias úteis Retorno', '')
+        if calculado and processo.get('Dias de Retorno', '').strip() != calculado:
+            processo['Dias de Retorno'] = calculado
+            corrigidos += 1
+    return corrigidos
+
 def fetch_sheet_data():
     """
     Busca dados da planilha do Google Sheets via export CSV
@@ -102,6 +133,12 @@ def parse_csv_data(csv_data):
         
         processos_filtrados.append(processo_filtrado)
     
+    from dias_uteis import apply_sla
+    apply_sla(processos_filtrados, sla_stages())
+    corrigidos = fix_dias_retorno(processos_filtrados)
+    if corrigidos:
+        print(f"🔧 Dias de Retorno recalculados em dias úteis: {corrigidos}")
+    
     print(f"✅ {len(processos_filtrados)} processos encontrados")
     print(f"📋 Colunas exibidas: {len(COLUNAS_EXIBIR)}")
     for i, coluna in enumerate(COLUNAS_EXIBIR, 1):
@@ -169,21 +206,24 @@ def save_data(processos_filtrados, processos_completos, analysis):
     processos_validos = [p for p in processos_filtrados if p.get('Protocolo GS', '').strip()]
     processos_completos_validos = [p for p in processos_completos if p.get('Protocolo GS', '').strip()]
     
-    # Contar processos únicos por combinação Protocolo + Nome
-    combinacoes_unicas = set()
-    for p in processos_validos:
-        protocolo = p.get('Protocolo GS', '').strip()
-        nome = p.get('Nome', '').strip()
-        if protocolo and nome:
-            combinacoes_unicas.add((protocolo, nome))
+    # Índice de processos únicos por combinação Protocolo + Nome (reaproveitado pela tabela HTML)
+    from generate_processos_table import REJECTED_FILE, count_status, dedup_processos
+    from quarantine import RejectedRows
+    with RejectedRows(REJECTED_FILE) as rejected:
+        processos_unicos = dedup_processos(processos_validos, rejected)
+    rejected.print_report()
+    status_count = count_status(processos_unicos)
     
-    total_processos_unicos = len(combinacoes_unicas)
+    total_processos_unicos = len(processos_unicos)
     
     print(f"📊 Filtro aplicado:")
     print(f"   - Registros totais: {len(processos_filtrados)}")
     print(f"   - Registros válidos (com protocolo): {len(processos_validos)}")
     print(f"   - Processos únicos (Protocolo + Nome): {total_processos_unicos}")
     
+    from dias_uteis import summarize_sla
+    analysis["sla"] = summarize_sla(processos_validos, sla_stages())
+    
     # Usar nomes limpos para metadata
     colunas_display = [COLUNAS_DISPLAY.get(col, col) for col in COLUNAS_EXIBIR]
     
@@ -201,11 +241,44 @@ def save_data(processos_filtrados, processos_completos, analysis):
         "analysis": analysis
     }
     
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    run_output_stages({
+        "output": output,
+        "processos_unicos": processos_unicos,
+        "status_count": status_count,
+    })
     
     print(f"✅ Dados salvos com sucesso!")
 
+def write_json_stage(contexto):
+    """
+    Etapa de saída: JSON de dados
+    """
+    from serializer import write_json
+    write_json(OUTPUT_FILE, contexto["output"])
+
+def write_html_stage(contexto):
+    """
+    Etapa de saída: tabela HTML dos processos únicos, sem reler o JSON
+    """
+    from generate_processos_table import OUTPUT_FILE as HTML_FILE, render_html, write_html
+    html = render_html(contexto["processos_unicos"], contexto["status_count"], contexto["output"]["metadata"])
+    write_html(html)
+    print(f"✅ Tabela HTML gerada: {HTML_FILE}")
+
+# Etapas de saída executadas a partir do mesmo estado em memória
+OUTPUT_STAGES = [write_json_stage, write_html_stage]
+
+def run_output_stages(contexto, stages=None):
+    """
+    Executa as etapas de saída em paralelo; a primeira falha é propagada
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    stages = OUTPUT_STAGES if stages is None else stages
+    with ThreadPoolExecutor(max_workers=len(stages) or 1) as executor:
+        futures = [executor.submit(stage, contexto) for stage in stages]
+        for future in futures:
+            future.result()
+
 def main():
     """
     Função principal
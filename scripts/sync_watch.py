@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Modo serviço (watch) da sincronização do Gestão Segura.
+
+Mantém o processo rodando, consulta a planilha em intervalos configuráveis
+com requisições condicionais (ETag / Last-Modified) e só reprocessa e
+republica os artefatos quando o conteúdo realmente muda. O estado processado
+(linhas, processos e análise) fica em memória entre as rodadas.
+
+Expõe um endpoint HTTP local com /health e /metrics para monitoramento.
+
+Uso:
+    python scripts/sync_processos.py --watch --intervalo 300 --porta 8765
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sync_processos
+
+
+class SyncState:
+    """
+    Estado mantido em memória entre as rodadas de sincronização.
+
+    Só a thread do laço de sincronização altera o estado; o lock protege apenas
+    os campos lidos pelos endpoints de saúde (contadores, processos, rejeitados).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.etag = None
+        self.last_modified = None
+        self.csv_hash = None
+        self.build_date = None
+        self.rows = None
+        self.processos = None
+        self.analysis = None
+        self.fingerprint = None
+        self.rejected = None
+
+        self.started_at = time.time()
+        self.last_check = None
+        self.last_change = None
+        self.last_publish = None
+        self.last_error = None
+        self.checks_total = 0
+        self.not_modified_total = 0
+        self.unchanged_total = 0
+        self.rebuilds_total = 0
+        self.publishes_total = 0
+        self.errors_total = 0
+        self.last_duration = 0.0
+
+
+def data_fingerprint(processos, analysis):
+    """Hash estável do conteúdo publicado (ignora o timestamp da metadata)."""
+    payload = json.dumps([processos, analysis], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def sync_once(state, fmt=None):
+    """
+    Executa uma rodada de sincronização.
+
+    Retorna "not_modified", "unchanged" ou "published".
+    """
+    text, etag, last_modified = sync_processos.fetch_csv_text(state.etag, state.last_modified)
+    today = date.today()
+
+    with state.lock:
+        state.checks_total += 1
+        state.last_check = time.time()
+
+    if text is not None:
+        csv_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if csv_hash != state.csv_hash:
+            state.rows = sync_processos.parse_csv_text(text)
+            state.csv_hash = csv_hash
+            state.build_date = None
+    elif state.rows is None:
+        # 304 sem estado em memória: não há o que reaproveitar
+        raise RuntimeError("servidor respondeu 304 sem dados em cache")
+    state.etag, state.last_modified = etag, last_modified
+
+    # dias_aberto depende da data atual: reprocessa na virada do dia.
+    # build_date só é marcado depois de uma publicação bem-sucedida, então uma
+    # falha em save_data é refeita na rodada seguinte mesmo com 304.
+    if state.build_date == today:
+        with state.lock:
+            if text is None:
+                state.not_modified_total += 1
+                return "not_modified"
+            state.unchanged_total += 1
+            return "unchanged"
+
+    # Reprocessa e publica fora do lock: /health e /metrics seguem respondendo
+    from quarantine import RejectedRows
+
+    with RejectedRows(sync_processos.REJECTED_FILE) as rejected:
+        processos = sync_processos.process_rows(state.rows, rejected, today)
+    analysis = sync_processos.generate_analysis(processos, today)
+    fingerprint = data_fingerprint(processos, analysis)
+    changed = fingerprint != state.fingerprint
+    if changed:
+        sync_processos.save_data(processos, analysis, fmt)
+
+    with state.lock:
+        state.rejected = rejected.report()
+        state.rebuilds_total += 1
+        state.processos, state.analysis = processos, analysis
+        state.build_date = today
+        state.fingerprint = fingerprint
+        if not changed:
+            state.unchanged_total += 1
+            return "unchanged"
+        state.last_change = state.last_publish = time.time()
+        state.publishes_total += 1
+        return "published"
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+def health_payload(state, interval):
+    with state.lock:
+        stale = state.last_check is None or time.time() - state.last_check > 3 * interval
+        return {
+            "status": "erro" if stale or state.last_error else "ok",
+            "ultima_verificacao": _iso(state.last_check),
+            "ultima_publicacao": _iso(state.last_publish),
+            "total_processos": len(state.processos) if state.processos is not None else None,
+            "ultimo_erro": state.last_error,
+            "rejeitados": state.rejected,
+        }
+
+
+def metrics_payload(state):
+    with state.lock:
+        metrics = [
+            ("gs_sync_uptime_seconds", time.time() - state.started_at),
+            ("gs_sync_checks_total", state.checks_total),
+            ("gs_sync_not_modified_total", state.not_modified_total),
+            ("gs_sync_unchanged_total", state.unchanged_total),
+            ("gs_sync_rebuilds_total", state.rebuilds_total),
+            ("gs_sync_publishes_total", state.publishes_total),
+            ("gs_sync_errors_total", state.errors_total),
+            ("gs_sync_last_duration_seconds", state.last_duration),
+            ("gs_sync_last_check_timestamp", state.last_check or 0),
+            ("gs_sync_last_publish_timestamp", state.last_publish or 0),
+            ("gs_sync_processos", len(state.processos) if state.processos is not None else 0),
+            ("gs_sync_rejeitados", state.rejected["total"] if state.rejected else 0),
+        ]
+    return "".join(f"{name} {round(value, 3)}\n" for name, value in metrics)
+
+
+def make_handler(state, interval):
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/health":
+                payload = health_payload(state, interval)
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                code = 200 if payload["status"] == "ok" else 503
+                content_type = "application/json; charset=utf-8"
+            elif self.path == "/metrics":
+                body = metrics_payload(state).encode("utf-8")
+                code = 200
+                content_type = "text/plain; version=0.0.4"
+            else:
+                body, code, content_type = b"", 404, "text/plain"
+
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return HealthHandler
+
+
+def start_health_server(state, interval, port):
+    """Sobe o endpoint de saúde em uma thread daemon (apenas localhost)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state, interval))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def run_watch(interval=300, port=8765, fmt=None):
+    """Laço principal do modo serviço."""
+    sync_processos.print_banner()
+    print(f"Modo serviço: verificando a planilha a cada {interval}s")
+
+    state = SyncState()
+    server = None
+    if port:
+        server = start_health_server(state, interval, port)
+        print(f"Saúde/métricas em http://127.0.0.1:{port}/health e /metrics")
+
+    try:
+        while True:
+            inicio = time.monotonic()
+            try:
+                result = sync_once(state, fmt)
+                with state.lock:
+                    state.last_error = None
+                print(f"[{datetime.now().strftime('%d/%m/%Y %H:%M:%S')}] {result}")
+            except Exception as e:
+                with state.lock:
+                    state.errors_total += 1
+                    state.last_error = str(e)
+                print(f"[{datetime.now().strftime('%d/%m/%Y %H:%M:%S')}] ERRO: {e}")
+            finally:
+                with state.lock:
+                    state.last_duration = time.monotonic() - inicio
+
+            time.sleep(max(0.0, interval - (time.monotonic() - inicio)))
+    except KeyboardInterrupt:
+        print("\nServiço encerrado.")
+    finally:
+        if server:
+            server.shutdown()
+    return 0
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Agregação financeira exata dos processos do Gestão Segura.
+
+As colunas monetárias chegam da planilha como texto no formato brasileiro
+("R$ 1.234,56", "105.866,00"). Aqui elas são convertidas uma única vez para
+centavos inteiros (array de int64), evitando erros de ponto flutuante, e
+agregadas em uma passada por fornecedor, tipo, mês de cadastro e criticidade.
+
+Os totais de topo (total_valor_reparo, total_custo_evento, total_previsao)
+saem em reais, como o frontend espera; os blocos detalhados saem em centavos.
+"""
+from array import array
+from collections import defaultdict
+
+from sync_processos import parse_date
+
+# Coluna da planilha -> nome do total no bloco "valores"
+MONEY_FIELDS = {
+    "valor_reparo": "total_valor_reparo",
+    "valor_fipe": "total_valor_fipe",
+    "custo_evento": "total_custo_evento",
+    "previsao_valor_reparo": "total_previsao",
+}
+
+# Dimensões de agrupamento: nome do bloco -> função que extrai a chave
+GROUP_BY = {
+    "por_fornecedor": lambda p: p.get("nome_fornecedor", "").strip(),
+    "por_tipo": lambda p: p.get("tipo", "").strip(),
+    "por_criticidade": lambda p: p.get("criticidade", "").strip(),
+    "por_mes": lambda p: _month_key(p.get("data_cadastro", "")),
+}
+
+# Limites superiores das faixas do histograma, em centavos (a última faixa é aberta)
+HISTOGRAM_EDGES = (100_000, 500_000, 1_000_000, 5_000_000, 10_000_000)
+HISTOGRAM_LABELS = ("até 1 mil", "1-5 mil", "5-10 mil", "10-50 mil", "50-100 mil", "acima de 100 mil")
+
+PERCENTILES = (25, 50, 75, 90)
+
+# Marcador de valor ausente/ inválido no array de centavos
+MISSING = -(2 ** 63)
+
+
+def parse_centavos(value):
+    """
+    Converte "R$ 1.234,56" em 123456 centavos.
+
+    Ponto é separador de milhar e vírgula é decimal. Retorna None para vazio
+    ou texto que não seja um valor monetário, inclusive número com ponto
+    decimal ("1234.56", como o gviz exporta células sem formatação): o ponto
+    só é aceito separando grupos completos de 3 dígitos.
+    """
+    if not value:
+        return None
+    text = value.strip().replace("R$", "").replace("\xa0", "").replace(" ", "")
+    negative = text.startswith("-")
+    if negative or text.startswith("+"):
+        text = text[1:]
+    if not text:
+        return None
+
+    inteiro, _, decimal = text.partition(",")
+    if "." in inteiro:
+        grupos = inteiro.split(".")
+        if not 1 <= len(grupos[0]) <= 3 or any(len(g) != 3 for g in grupos[1:]):
+            return None
+        inteiro = "".join(grupos)
+    if not inteiro.isdigit() or (decimal and not decimal.isdigit()) or len(decimal) > 2:
+        return None
+
+    centavos = int(inteiro) * 100 + int(decimal.ljust(2, "0") or 0)
+    return -centavos if negative else centavos
+
+
+def parse_money_column(processos, field):
+    """
+    Converte uma coluna inteira para um array de centavos (int64).
+
+    Valores repetidos são convertidos uma vez só; ausentes viram MISSING.
+    """
+    cache = {}
+    column = array("q")
+    append = column.append
+    for p in processos:
+        raw = p.get(field, "")
+        cents = cache.get(raw)
+        if cents is None:
+            parsed = parse_centavos(raw)
+            cents = cache[raw] = MISSING if parsed is None else parsed
+        append(cents)
+    return column
+
+
+def _month_key(date_str):
+    dt = parse_date(date_str)
+    return f"{dt.year}-{str(dt.month).zfill(2)}" if dt else ""
+
+
+def _round_div(numerator, denominator):
+    """Divisão inteira com arredondamento para o mais próximo (meio para par)."""
+    q, r = divmod(numerator, denominator)
+    if 2 * r > denominator or (2 * r == denominator and q % 2 == 1):
+        q += 1
+    return q
+
+
+def _histogram(sorted_values):
+    counts = [0] * (len(HISTOGRAM_EDGES) + 1)
+    bucket = 0
+    for v in sorted_values:
+        while bucket < len(HISTOGRAM_EDGES) and v > HISTOGRAM_EDGES[bucket]:
+            bucket += 1
+        counts[bucket] += 1
+    return dict(zip(HISTOGRAM_LABELS, counts))
+
+
+def summarize(values):
+    """Estatísticas de uma lista de centavos: soma, média, percentis e histograma."""
+    values = sorted(values)
+    n = len(values)
+    total = sum(values)
+    stats = {"quantidade": n, "soma": total, "media": _round_div(total, n) if n else 0}
+    for pct in PERCENTILES:
+        # Percentil pelo método do posto mais próximo (sempre um valor observado)
+        stats[f"p{pct}"] = values[max(0, -(-pct * n // 100) - 1)] if n else 0
+    stats["histograma"] = _histogram(values)
+    return stats
+
+
+def aggregate_valores(processos):
+    """Monta o bloco "valores" da análise em uma passada sobre os processos."""
+    columns = {field: parse_money_column(processos, field) for field in MONEY_FIELDS}
+    keys = {group: [key(p) for p in processos] for group, key in GROUP_BY.items()}
+
+    totals = dict.fromkeys(MONEY_FIELDS, 0)
+    overall = defaultdict(list)
+    grouped = {group: defaultdict(lambda: defaultdict(list)) for group in GROUP_BY}
+
+    for i in range(len(processos)):
+        for field, column in columns.items():
+            cents = column[i]
+            if cents == MISSING:
+                continue
+            totals[field] += cents
+            overall[field].append(cents)
+            for group, group_keys in keys.items():
+                if group_keys[i]:
+                    grouped[group][group_keys[i]][field].append(cents)
+
+    valores = {total_name: totals[field] / 100 for field, total_name in MONEY_FIELDS.items()}
+    valores["centavos"] = {total_name: totals[field] for field, total_name in MONEY_FIELDS.items()}
+    valores["geral"] = {field: summarize(overall[field]) for field in MONEY_FIELDS}
+    for group, by_key in grouped.items():
+        valores[group] = {
+            key: {field: summarize(values) for field, values in fields.items()}
+            for key, fields in sorted(by_key.items())
+        }
+    return valores
@@ -1,17 +1,109 @@
 import { useState, useEffect } from 'react';
 import type { ProcessoData } from '../types/processo';
 
+const CACHE_KEY = 'gs-processos';
+
+interface PatchOp {
+  op: 'add' | 'remove' | 'replace';
+  path: string;
+  value?: unknown;
+}
+
+interface PatchManifest {
+  versao_atual: number;
+  base: { versao: number; arquivo: string };
+  patches: { de: number; para: number; arquivo: string }[];
+}
+
+async function fetchJson<T>(url: string): Promise<T> {
+  const res = await fetch(url);
+  if (!res.ok) throw new Error('Erro ao carregar dados');
+  return res.json();
+}
+
+function readCache(): ProcessoData | null {
+  try {
+    const raw = localStorage.getItem(CACHE_KEY);
+    return raw ? (JSON.parse(raw) as ProcessoData) : null;
+  } catch {
+    return null;
+  }
+}
+
+function writeCache(data: ProcessoData) {
+  try {
+    localStorage.setItem(CACHE_KEY, JSON.stringify(data));
+  } catch {
+    // Sem espaço ou armazenamento indisponível: segue sem cache
+  }
+}
+
+// Aplica as operações add/remove/replace geradas por scripts/snapshot_diff.py
+function applyPatch(doc: unknown, ops: PatchOp[]) {
+  for (const op of ops) {
+    const tokens = op.path.split('/').slice(1).map((t) => t.replace(/~1/g, '/').replace(/~0/g, '~'));
+    const last = tokens.pop() as string;
+    let parent = doc as Record<string, unknown>;
+    for (const token of tokens) parent = parent[token] as Record<string, unknown>;
+
+    if (Array.isArray(parent)) {
+      const index = last === '-' ? parent.length : Number(last);
+      if (op.op === 'add') parent.splice(index, 0, op.value);
+      else if (op.op === 'remove') parent.splice(index, 1);
+      else parent[index] = op.value;
+    } else if (op.op === 'remove') {
+      delete parent[last];
+    } else {
+      parent[last] = op.value;
+    }
+  }
+}
+
+// Leva um snapshot (cache ou base) à versão atual aplicando só os patches publicados depois dele
+async function applyPending(doc: ProcessoData, manifest: PatchManifest): Promise<ProcessoData | null> {
+  const version = doc.metadata.versao;
+  if (version === undefined || version < manifest.base.versao) return null;
+  if (version === manifest.versao_atual) return doc;
+
+  const pending = manifest.patches.filter((p) => p.para > version).sort((a, b) => a.para - b.para);
+  if (!pending.length || pending[0].de !== version) return null;
+
+  const patches = await Promise.all(pending.map((p) => fetchJson<PatchOp[]>(`/data/patches/${p.arquivo}`)));
+  for (const ops of patches) applyPatch(doc, ops);
+  return doc.metadata.versao === manifest.versao_atual ? doc : null;
+}
+
+async function loadProcessos(): Promise<ProcessoData> {
+  const manifest = await fetchJson<PatchManifest>('/data/patches/manifest.json');
+
+  const cached = readCache();
+  if (cached) {
+    try {
+      const updated = await applyPending(cached, manifest);
+      if (updated) {
+        writeCache(updated);
+        return updated;
+      }
+    } catch {
+      // Patch indisponível: recomeça pela base
+    }
+  }
+
+  // Sem cache válido: baixa a base e aplica os patches seguintes
+  const base = await fetchJson<ProcessoData>(`/data/patches/${manifest.base.arquivo}`);
+  const data = await applyPending(base, manifest);
+  if (!data) throw new Error('Erro ao carregar dados');
+  writeCache(data);
+  return data;
+}
+
 export function useProcessos() {
   const [data, setData] = useState<ProcessoData | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
-    fetch('/data/processos.json')
-      .then((res) => {
-        if (!res.ok) throw new Error('Erro ao carregar dados');
-        return res.json();
-      })
+    loadProcessos()
       .then((json: ProcessoData) => {
         setData(json);
         setLoading(false);
@@ -23,6 +23,8 @@ export interface Processo {
   dias_aberto: string;
   criticidade: string;
   parecer_coordenacao: string;
+  dias_uteis_entrega: string;
+  sla_entrega: '' | 'Dentro do Prazo' | 'Estourado';
 }
 
 export interface TopAntigo {
@@ -54,11 +56,64 @@ export interface Analysis {
   processos_por_mes: Record<string, number>;
   top_mais_antigos: TopAntigo[];
   top_fornecedores: TopFornecedor[];
-  valores: {
+  valores: Valores;
+  sla: Record<string, ResumoSla>;
+  envelhecimento: Envelhecimento;
+}
+
+export interface Envelhecimento {
+  quantis: Record<'p25' | 'p50' | 'p75' | 'p90' | 'p95', number | null>;
+  /** Quantidade de processos por faixa de dias_aberto ("0-15", "16-30", ..., "366+") */
+  faixas: Record<string, number>;
+  por_fornecedor: Record<string, { quantidade: number; p50: number; p90: number; max: number }>;
+  /** Dias de cada coluna da matriz de coortes */
+  marcos_coorte: number[];
+  /** mês de cadastro -> [total, [elegíveis, ainda abertos] para cada marco] */
+  coortes: Record<string, [number, [number, number][]]>;
+}
+
+export interface ResumoSla {
+  limite_dias_uteis: number;
+  concluidos: number;
+  em_andamento: number;
+  estourados: number;
+  media_dias_uteis_concluidos: number | null;
+}
+
+export type CampoMonetario = 'valor_reparo' | 'valor_fipe' | 'custo_evento' | 'previsao_valor_reparo';
+
+/** Estatísticas de uma coluna monetária; todos os valores em centavos. */
+export interface EstatisticaValor {
+  quantidade: number;
+  soma: number;
+  media: number;
+  p25: number;
+  p50: number;
+  p75: number;
+  p90: number;
+  histograma: Record<string, number>;
+}
+
+export type EstatisticasPorCampo = Partial<Record<CampoMonetario, EstatisticaValor>>;
+
+export interface Valores {
+  /** Totais em reais */
+  total_valor_reparo: number;
+  total_valor_fipe: number;
+  total_custo_evento: number;
+  total_previsao: number;
+  /** Mesmos totais, exatos, em centavos */
+  centavos: {
     total_valor_reparo: number;
+    total_valor_fipe: number;
     total_custo_evento: number;
     total_previsao: number;
   };
+  geral: Record<CampoMonetario, EstatisticaValor>;
+  por_fornecedor: Record<string, EstatisticasPorCampo>;
+  por_tipo: Record<string, EstatisticasPorCampo>;
+  por_mes: Record<string, EstatisticasPorCampo>;
+  por_criticidade: Record<string, EstatisticasPorCampo>;
 }
 
 export interface ProcessoData {
@@ -67,6 +122,8 @@ export interface ProcessoData {
     total_processos: number;
     fonte: string;
     planilha_id: string;
+    /** Versão do snapshot na publicação diferencial (public/data/patches) */
+    versao?: number;
   };
   analysis: Analysis;
   processos: Processo[];